@@ -0,0 +1,48 @@
+"""
+Сравнение форматов файлов: CSV, pickle и бинарный колоночный формат.
+Запуск: python -m benchmarks.bench_formats [число_строк]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from table_processor import Table, load_table, save_table
+
+
+def make_table(n_rows):
+    """Типизированная таблица: int, float, bool, datetime и str колонки"""
+    start = datetime(2020, 1, 1)
+    rows = [[i, i * 0.5 if i % 13 else None, i % 3 == 0,
+             start + timedelta(minutes=i), f"customer_{i % 1000}"]
+            for i in range(n_rows)]
+    table = Table(rows, ["id", "price", "flag", "created", "customer"])
+    table.set_column_types({0: "int", 1: "float", 2: "bool", 3: "datetime", 4: "str"})
+    return table
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main(n_rows=200_000):
+    table = make_table(n_rows)
+    print(f"Rows: {n_rows}")
+    print(f"{'format':<10}{'size, MB':>10}{'save, s':>10}{'load, s':>10}{'one column, s':>15}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for ext in ("csv", "pkl", "tcol"):
+            path = os.path.join(tmp, f"bench.{ext}")
+            save_time, _ = timed(lambda: save_table(table, path))
+            load_time, loaded = timed(lambda: load_table(path))
+            # Открыть файл заново и прочитать одну колонку
+            column_time, _ = timed(lambda: load_table(path).get_values("price"))
+            size = os.path.getsize(path) / 2 ** 20
+            print(f"{ext:<10}{size:>10.1f}{save_time:>10.3f}{load_time:>10.3f}{column_time:>15.3f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,57 @@
+"""
+Масштабирование параллельного приведения типов по числу процессов.
+Запуск: python -m benchmarks.bench_parallel [число_строк] [число_колонок] [макс_процессов]
+"""
+
+import os
+import random
+import sys
+import time
+
+from table_processor import Table
+
+KINDS = ("int", "float", "bool", "datetime", "str")
+
+
+def make_rows(n_rows, n_columns, seed=0):
+    """Строки как после чтения CSV: колонки int, float, bool, datetime и str по кругу"""
+    rnd = random.Random(seed)
+    makers = {
+        "int": lambda: str(rnd.randrange(10 ** 6)),
+        "float": lambda: f"{rnd.random() * 1000:.3f}",
+        "bool": lambda: rnd.choice(("true", "false")),
+        "datetime": lambda: f"2024-{rnd.randrange(1, 13):02d}-{rnd.randrange(1, 29):02d}",
+        "str": lambda: f"name_{rnd.randrange(1000)}",
+    }
+    kinds = [KINDS[c % len(KINDS)] for c in range(n_columns)]
+    return [[makers[kind]() for kind in kinds] for _ in range(n_rows)]
+
+
+def measure(rows, columns, workers):
+    table = Table([list(row) for row in rows], columns)
+    start = time.perf_counter()
+    table.auto_detect_column_types(workers=workers)
+    return time.perf_counter() - start, table
+
+
+def main(n_rows=100_000, n_columns=20, max_workers=None):
+    max_workers = max_workers or os.cpu_count() or 1
+    columns = [f"c{i}" for i in range(n_columns)]
+    rows = make_rows(n_rows, n_columns)
+    print(f"Rows: {n_rows}, columns: {n_columns}, cores: {os.cpu_count()}")
+    print(f"{'workers':<10}{'seconds':>10}{'speedup':>10}")
+
+    serial_time, serial = measure(rows, columns, None)
+    print(f"{1:<10}{serial_time:>10.3f}{1:>10.2f}")
+    expected = [serial.get_values(col) for col in columns]
+    for workers in range(2, max_workers + 1):
+        seconds, table = measure(rows, columns, workers)
+        # Параллельный путь должен давать тот же результат, что и последовательный
+        assert table.get_column_types() == serial.get_column_types()
+        assert [table.get_values(col) for col in columns] == expected
+        print(f"{workers:<10}{seconds:>10.3f}{serial_time / seconds:>10.2f}")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:4]]
+    main(*args)
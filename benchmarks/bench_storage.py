@@ -0,0 +1,65 @@
+"""
+Сравнение построчного и колоночного хранения Table: память и скорость.
+Запуск: python -m benchmarks.bench_storage [число_строк]
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+
+from table_processor import Table
+
+
+def make_rows(n_rows, seed=0):
+    """Синтетические строки: int, float, bool и str колонки с пропусками"""
+    rnd = random.Random(seed)
+    rows = []
+    for i in range(n_rows):
+        rows.append([
+            i,
+            rnd.random() * 1000 if i % 17 else None,
+            rnd.random() < 0.5,
+            rnd.randrange(10 ** 6),
+            f"name_{i % 100}",
+        ])
+    return rows
+
+
+COLUMNS = ["id", "price", "flag", "amount", "name"]
+TYPES = {"id": "int", "price": "float", "flag": "bool", "amount": "int", "name": "str"}
+
+
+def measure(storage, rows):
+    tracemalloc.start()
+    start = time.perf_counter()
+    table = Table(rows, COLUMNS, TYPES, storage=storage)
+    build_time = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    
+    start = time.perf_counter()
+    for col in COLUMNS:
+        table.get_values(col)
+    read_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    table.set_values(table.get_values("amount"), "amount")
+    write_time = time.perf_counter() - start
+    
+    return {"memory_mb": memory / 2 ** 20, "build_s": build_time,
+            "get_values_s": read_time, "set_values_s": write_time}
+
+
+def main(n_rows=200_000):
+    rows = make_rows(n_rows)
+    print(f"Rows: {n_rows}, columns: {len(COLUMNS)}")
+    print(f"{'storage':<10}{'memory, MB':>12}{'build, s':>10}{'get_values, s':>15}{'set_values, s':>15}")
+    for storage in ("rows", "columns"):
+        result = measure(storage, rows)
+        print(f"{storage:<10}{result['memory_mb']:>12.1f}{result['build_s']:>10.3f}"
+              f"{result['get_values_s']:>15.3f}{result['set_values_s']:>15.3f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,214 @@
+"""
+Набор бенчмарков для горячих путей table_processor.
+
+Запуск:
+    python -m benchmarks.run                         # 10k и 1M ячеек
+    python -m benchmarks.run --sizes 10k,1m,10m --output results.json
+    python -m benchmarks.run --compare results.json  # сравнение с прошлым прогоном
+
+Результат - JSON со временем (лучшее из --repeat) и пиковой памятью
+(tracemalloc, отдельный прогон) каждой операции для каждого размера.
+С --compare процесс завершается с кодом 1, если какая-то операция
+замедлилась больше чем в --threshold раз.
+"""
+
+import argparse
+import csv
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from table_processor import load_csv, load_pickle, save_pickle, save_text
+
+COLUMNS = ["id", "amount", "flag", "created", "category", "score", "note", "ratio"]
+TYPES = {"id": "int", "amount": "float", "flag": "bool", "created": "datetime",
+         "category": "str", "score": "int", "note": "str", "ratio": "float"}
+SIZES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+
+
+def generate_rows(n_rows, seed=0):
+    """Синтетические строки (как после чтения CSV) со смешанными типами и пропусками"""
+    rnd = random.Random(seed)
+    start = datetime(2020, 1, 1)
+    categories = ["alpha", "beta", "gamma", "delta", "epsilon"]
+    for i in range(n_rows):
+        yield [
+            str(i),
+            f"{rnd.random() * 1000:.2f}",
+            rnd.choice(("true", "false")),
+            (start + timedelta(seconds=rnd.randrange(10 ** 8))).strftime("%Y-%m-%d %H:%M:%S"),
+            rnd.choice(categories),
+            "" if i % 11 == 0 else str(rnd.randrange(1000)),
+            "" if i % 3 == 0 else f"note {rnd.randrange(100)}",
+            "" if i % 7 == 0 else f"{rnd.random():.4f}",
+        ]
+
+
+class Context:
+    """Файлы и таблицы одного размера, общие для всех операций"""
+
+    def __init__(self, n_cells, tmp_dir):
+        self.n_rows = max(1, n_cells // len(COLUMNS))
+        self.csv_path = os.path.join(tmp_dir, f"bench_{n_cells}.csv")
+        self.pickle_path = os.path.join(tmp_dir, f"bench_{n_cells}.pkl")
+        self.text_path = os.path.join(tmp_dir, f"bench_{n_cells}.txt")
+        with open(self.csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(COLUMNS)
+            writer.writerows(generate_rows(self.n_rows))
+        self.typed_table = load_csv(self.csv_path)
+        self.typed_table.set_column_types(TYPES, by_number=False)
+        save_pickle(self.typed_table, self.pickle_path)
+        rnd = random.Random(1)
+        self.keys = [rnd.randrange(self.n_rows) for _ in range(1000)]
+
+
+# Каждый случай получает Context и возвращает функцию без аргументов для замера.
+# Подготовка (например, загрузка таблицы для set_column_types) в замер не входит.
+
+def case_load_csv(ctx):
+    return lambda: load_csv(ctx.csv_path)
+
+
+def case_load_pickle(ctx):
+    return lambda: load_pickle(ctx.pickle_path)
+
+
+def case_auto_detect_column_types(ctx):
+    table = load_csv(ctx.csv_path)
+    return table.auto_detect_column_types
+
+
+def case_set_column_types(ctx):
+    table = load_csv(ctx.csv_path)
+    return lambda: table.set_column_types(TYPES, by_number=False)
+
+
+def case_get_values(ctx):
+    table = ctx.typed_table
+    return lambda: [table.get_values(col) for col in COLUMNS]
+
+
+def case_get_rows_by_index(ctx):
+    table = ctx.typed_table
+    return lambda: [table.get_rows_by_index(key) for key in ctx.keys]
+
+
+def case_get_rows_by_number(ctx):
+    table = ctx.typed_table
+    page = 100
+
+    def run():
+        for start in range(0, ctx.n_rows - page, max(page, ctx.n_rows // 1000)):
+            table.get_rows_by_number(start, start + page).get_values(0)
+    return run
+
+
+def case_save_text(ctx):
+    return lambda: save_text(ctx.typed_table, ctx.text_path, max_rows=None)
+
+
+CASES = {name[len("case_"):]: func for name, func in globals().items() if name.startswith("case_")}
+
+
+def measure(setup, ctx, repeat):
+    """Лучшее время из repeat прогонов и пиковая память отдельного прогона"""
+    best = None
+    for _ in range(repeat):
+        func = setup(ctx)
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    func = setup(ctx)
+    gc.collect()
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"seconds": round(best, 6), "peak_mb": round(peak / 2 ** 20, 3)}
+
+
+def run(sizes, cases, repeat):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            ctx = Context(SIZES[size], tmp_dir)
+            results[size] = {}
+            for name in cases:
+                results[size][name] = measure(CASES[name], ctx, repeat)
+                print(f"{size:>4} {name:<26} {results[size][name]['seconds']:>10.4f} s "
+                      f"{results[size][name]['peak_mb']:>10.1f} MB", file=sys.stderr)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """Список операций, замедлившихся больше чем в threshold раз"""
+    regressions = []
+    for size, cases in current["results"].items():
+        for name, result in cases.items():
+            old = baseline.get("results", {}).get(size, {}).get(name)
+            if old and old["seconds"] > 0:
+                ratio = result["seconds"] / old["seconds"]
+                print(f"{size:>4} {name:<26} x{ratio:.2f}", file=sys.stderr)
+                if ratio > threshold:
+                    regressions.append((size, name, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="table_processor benchmarks")
+    parser.add_argument("--sizes", default="10k,1m", help="comma separated: 10k,1m,10m")
+    parser.add_argument("--cases", default=",".join(CASES), help="comma separated case names")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write JSON results to this file (default: stdout)")
+    parser.add_argument("--compare", help="previous JSON results to compare with")
+    parser.add_argument("--threshold", type=float, default=1.2, help="allowed slowdown ratio")
+    args = parser.parse_args(argv)
+
+    sizes = [s.strip().lower() for s in args.sizes.split(",") if s.strip()]
+    cases = [c.strip() for c in args.cases.split(",") if c.strip()]
+    for size in sizes:
+        if size not in SIZES:
+            parser.error(f"unknown size: {size}")
+    for case in cases:
+        if case not in CASES:
+            parser.error(f"unknown case: {case}")
+
+    report = run(sizes, cases, args.repeat)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        if regressions:
+            for size, name, ratio in regressions:
+                print(f"REGRESSION {size} {name}: x{ratio:.2f}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
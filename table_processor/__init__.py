@@ -1,34 +1,169 @@
+import asyncio
+import functools
+import os
+import threading
 from .base_table import Table
-from .csv_handler import load_csv, save_csv
+from .csv_handler import load_csv, save_csv, iter_csv, CsvWriter
 from .pickle_handler import load_pickle, save_pickle
-from .text_handler import save_text
+from .columnar_handler import load_columnar, save_columnar, open_columnar
+from .text_handler import save_text, iter_text
+from .lazy_csv import open_csv
+from .segments import merge_tables
+from .profiling import profile, add_hook, remove_hook
 
-def load_table(*files, file_type=None, detect_types=False, **kwargs):
-    """Универсальная загрузка"""
+# Тип файла по расширению
+FILE_TYPES = {'csv': 'csv', 'pkl': 'pickle', 'pickle': 'pickle', 'tcol': 'columnar'}
+# Число файлов, которые aload_table/asave_table обрабатывают одновременно
+ASYNC_CONCURRENCY = 4
+# Строк в одной порции при асинхронном чтении/записи CSV
+ASYNC_CHUNK_ROWS = 10000
+# Дополнительные параметры aload_table для каждого типа файла
+ASYNC_LOAD_OPTIONS = {'csv': ('delimiter', 'encoding'), 'pickle': (), 'columnar': ()}
+
+def _file_type(file_path, default=None):
+    ext = file_path.split('.')[-1].lower()
+    return FILE_TYPES.get(ext, default)
+
+def load_table(*files, file_type=None, detect_types=False, lazy=False, **kwargs):
+    """Универсальная загрузка (workers=N - параллельная загрузка нескольких файлов csv/pickle,
+    lazy=True - ленивое чтение одного CSV файла через open_csv)"""
     if file_type is None:
-        ext = files[0].split('.')[-1].lower()
-        file_type = 'csv' if ext == 'csv' else 'pickle' if ext in ('pkl', 'pickle') else None
-    
+        file_type = _file_type(files[0])
+
+    if lazy:
+        if file_type != 'csv' or len(files) != 1:
+            raise ValueError("Lazy loading supports a single CSV file")
+        table = open_csv(files[0], **kwargs)
+        if detect_types:
+            table.auto_detect_column_types()
+        return table
     if file_type == 'csv':
         return load_csv(*files, detect_types=detect_types, **kwargs)
     elif file_type == 'pickle':
-        return load_pickle(*files, detect_types=detect_types)
+        return load_pickle(*files, detect_types=detect_types, **kwargs)
+    elif file_type == 'columnar':
+        return load_columnar(*files, detect_types=detect_types)
     else:
         raise ValueError(f"Unknown file type: {file_type}")
 
 def save_table(table, file_path, file_type=None, **kwargs):
     """Универсальное сохранение"""
     if file_type is None:
-        ext = file_path.split('.')[-1].lower()
-        file_type = 'csv' if ext == 'csv' else 'pickle' if ext in ('pkl', 'pickle') else 'txt'
-    
+        file_type = _file_type(file_path, 'txt')
+
     if file_type == 'csv':
         save_csv(table, file_path, **kwargs)
     elif file_type == 'pickle':
         save_pickle(table, file_path)
+    elif file_type == 'columnar':
+        save_columnar(table, file_path)
     elif file_type == 'txt':
         save_text(table, file_path, **kwargs)
     else:
         raise ValueError(f"Unknown file type: {file_type}")
 
-__all__ = ['Table', 'load_table', 'save_table']
+# === Асинхронный интерфейс ===
+
+async def _in_executor(executor, func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+
+async def _aload_csv(file_path, chunk_rows, executor, delimiter=',', encoding='utf-8'):
+    """Чтение CSV порциями: между порциями цикл событий свободен"""
+    chunks = iter_csv(file_path, chunk_rows=chunk_rows, delimiter=delimiter, encoding=encoding)
+    columns = None
+    rows = []
+    while True:
+        chunk = await _in_executor(executor, next, chunks, None)
+        if chunk is None:
+            break
+        columns = chunk._columns
+        rows.extend(chunk._data)
+    if columns is None:
+        # Пустой файл или только заголовок
+        return await _in_executor(executor, load_csv, file_path, delimiter=delimiter,
+                                  encoding=encoding)
+    return Table._from_rows(rows, columns)
+
+async def aload_table(*files, file_type=None, detect_types=False, concurrency=None,
+                      chunk_rows=ASYNC_CHUNK_ROWS, executor=None, **kwargs):
+    """Асинхронная загрузка: разбор в executor, CSV - порциями по chunk_rows строк.
+    
+    Несколько файлов загружаются одновременно (не более concurrency сразу),
+    результат - одна таблица в порядке файлов. Дополнительные параметры -
+    только из ASYNC_LOAD_OPTIONS для типа файла.
+    """
+    if not files:
+        raise ValueError("No files provided")
+    # Параметры проверяются до начала загрузки: неподдерживаемые не теряются молча
+    for file_path in files:
+        one_type = file_type or _file_type(file_path)
+        unsupported = sorted(set(kwargs) - set(ASYNC_LOAD_OPTIONS.get(one_type, ())))
+        if unsupported:
+            raise ValueError(f"Unsupported options for {one_type} file {file_path}: {unsupported}")
+    limit = asyncio.Semaphore(concurrency or ASYNC_CONCURRENCY)
+
+    async def load_one(file_path):
+        async with limit:
+            one_type = file_type or _file_type(file_path)
+            if one_type == 'csv':
+                return await _aload_csv(file_path, chunk_rows, executor, **kwargs)
+            return await _in_executor(executor, load_table, file_path, file_type=one_type)
+
+    tables = await asyncio.gather(*(load_one(file_path) for file_path in files))
+    table = merge_tables(tables, files)
+    if detect_types:
+        await _in_executor(executor, table.auto_detect_column_types)
+    return table
+
+def _save_file(table, file_path, file_type, chunk_rows, cancelled, lock, kwargs):
+    """Сохранение во временный файл .partial и замена им file_path.
+    
+    При отмене или ошибке временный файл удаляется, а файл, дописываемый
+    в режиме append, обрезается до исходного размера.
+    """
+    append = file_type == 'csv' and kwargs.get('append') and os.path.exists(file_path)
+    target = file_path if append else file_path + '.partial'
+    original_size = os.path.getsize(file_path) if append else None
+    try:
+        if file_type == 'csv':
+            with CsvWriter(target, table=table, **dict(kwargs, append=bool(append))) as writer:
+                data = table._data
+                for start in range(0, len(data), chunk_rows):
+                    if cancelled.is_set():
+                        raise asyncio.CancelledError()
+                    writer.write_rows(data[start:start + chunk_rows])
+        else:
+            save_table(table, target, file_type=file_type, **kwargs)
+        with lock:
+            if cancelled.is_set():
+                raise asyncio.CancelledError()
+            if not append:
+                os.replace(target, file_path)
+    except BaseException:
+        if append:
+            with open(file_path, 'r+b') as f:
+                f.truncate(original_size)
+        elif os.path.exists(target):
+            os.remove(target)
+        raise
+
+async def asave_table(table, file_path, file_type=None, chunk_rows=ASYNC_CHUNK_ROWS,
+                      executor=None, **kwargs):
+    """Асинхронное сохранение в executor; при отмене частично записанный файл удаляется"""
+    if file_type is None:
+        file_type = _file_type(file_path, 'txt')
+    if file_type not in ('csv', 'pickle', 'columnar', 'txt'):
+        raise ValueError(f"Unknown file type: {file_type}")
+    cancelled = threading.Event()
+    lock = threading.Lock()
+    try:
+        await _in_executor(executor, _save_file, table, file_path, file_type, chunk_rows,
+                           cancelled, lock, kwargs)
+    except asyncio.CancelledError:
+        # Поток записи завершится сам на ближайшей проверке и удалит свой файл
+        with lock:
+            cancelled.set()
+        raise
+
+__all__ = ['Table', 'load_table', 'save_table', 'aload_table', 'asave_table']
@@ -1,128 +1,301 @@
 import csv
 import pickle
 import copy
-from datetime import datetime
+import random
+import weakref
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
 from typing import List, Dict, Any, Union
+from .indexes import KeyIndex, SortedIndex
+from .column_store import ColumnStore
+from .casting import (TYPES, CACHED_TYPES, CastCache, detect_cell, detect_column_type,
+                      cast_cell, make_caster, is_categorical, cast_block, TypeInference)
+from .views import ColumnView, RowView
+from .rendering import render_lines
+from .profiling import instrumented
 
 class TableError(Exception):
     pass
 
+STORAGES = ('rows', 'columns')
+# Типы колонок, по которым строится сортированный индекс
+SORTED_INDEX_TYPES = ('int', 'float', 'bool', 'datetime', 'str', 'category')
+# Размер пачки строк при добавлении (приведение типов выполняется пачками)
+APPEND_BATCH_ROWS = 10000
+# Наибольшая запись set_values, при которой индексы обновляются по строкам
+INDEX_UPDATE_ROWS = 64
+# Режимы auto_detect_column_types: первые строки, вся колонка, случайная выборка строк
+INFERENCE_MODES = ('head', 'full', 'reservoir')
+HEAD_SAMPLES = 10
+RESERVOIR_ROWS = 10000
+# Наибольший блок строк одной задачи параллельного приведения типов
+PARALLEL_BLOCK_ROWS = 200000
+
 class Table:
-    def __init__(self, data=None, columns=None, column_types=None, parent=None):
+    def __init__(self, data=None, columns=None, column_types=None, parent=None, storage='rows'):
         self._parent = parent
-        self._data = [list(row) for row in data] if data else []
+        self._positions = None
+        self._key_index = None
+        self._local_positions = None
+        # Живые представления корневой таблицы (создается при первом представлении)
+        self._views = None
+        # Кеши приведения по именам колонок (у корневой таблицы)
+        self._cast_caches = {}
+        # Сортированные индексы по именам колонок (у корневой таблицы)
+        self._indexes = {}
+        # Представление разделяет строки с родителем, а не копирует их
+        if parent is not None:
+            self._data = list(data) if data else []
+        else:
+            self._data = [list(row) for row in data] if data else []
         self._columns = list(columns) if columns else []
         self._column_types = dict(column_types) if column_types else {}
+        # Колонки, значения которых уже хранятся приведенными к объявленному типу
+        self._typed = set()
         
         if not self._columns and self._data:
             self._columns = [f"col_{i}" for i in range(len(self._data[0]))]
+        self._refresh_schema()
         
         self._normalize_data()
+        if storage == 'columns':
+            self._data = self._build_column_store(self._data)
+        elif storage != 'rows':
+            raise TableError(f"Unknown storage: {storage}")
+    
+    @classmethod
+    def _from_rows(cls, rows, columns, column_types=None):
+        """Создает таблицу, забирая список строк без копирования"""
+        table = cls(None, columns, column_types)
+        table._data = rows
+        if not table._columns and rows:
+            table._columns = [f"col_{i}" for i in range(len(rows[0]))]
+            table._refresh_schema()
+        table._normalize_data()
+        return table
+    
+    def __setstate__(self, state):
+        # Объекты Table, сохраненные старыми версиями, не имеют новых атрибутов
+        self.__dict__.update({'_positions': None, '_key_index': None,
+                              '_local_positions': None, '_typed': set(), '_indexes': {}})
+        self.__dict__.update(state)
+        self._views = None
+        self._cast_caches = {}
+        self._refresh_schema()
+    
+    def __getstate__(self):
+        # Слабые ссылки на представления не сериализуются
+        state = dict(self.__dict__)
+        state['_views'] = None
+        state['_cast_caches'] = {}
+        return state
+    
+    def _refresh_schema(self):
+        """Пересчитывает карту имя -> номер колонки и вектор типов по номерам.
+        
+        Объекты обновляются на месте, поэтому представления, разделяющие их
+        с таблицей, видят изменения.
+        """
+        col_pos = {}
+        for i, col in enumerate(self._columns):
+            col_pos.setdefault(col, i)
+        type_vec = [self._column_types.get(col, 'str') for col in self._columns]
+        if getattr(self, '_col_pos', None) is None:
+            self._col_pos = col_pos
+            self._type_vec = type_vec
+        else:
+            self._col_pos.clear()
+            self._col_pos.update(col_pos)
+            self._type_vec[:] = type_vec
+    
+    def _set_column_type(self, col_idx, col_type):
+        """Задает тип колонки в словаре типов и в векторе типов"""
+        col_name = self._columns[col_idx]
+        if self._column_types.get(col_name) != col_type:
+            # Индекс построен по значениям прежнего типа
+            self._indexes.pop(col_name, None)
+        self._column_types[col_name] = col_type
+        for i, col in enumerate(self._columns):
+            if col == col_name:
+                self._type_vec[i] = col_type
+    
+    def _resolve_column(self, column):
+        """Номер колонки по номеру или имени"""
+        if isinstance(column, int):
+            if not 0 <= column < len(self._columns):
+                raise TableError(f"Invalid column index: {column}")
+            return column
+        elif isinstance(column, str):
+            col_idx = self._col_pos.get(column)
+            if col_idx is None:
+                raise TableError(f"Column not found: {column}")
+            return col_idx
+        else:
+            raise TableError("Column must be int or str")
+    
+    def _cast_values(self, col_idx, values, caster=None):
+        """Приводит значения к типу колонки через кеш приведения колонки"""
+        col_type = self._type_vec[col_idx]
+        if col_type not in CACHED_TYPES:
+            caster = caster or make_caster(col_type)
+            return [caster(v) for v in values]
+        root = self._parent if self._parent is not None else self
+        col_name = self._columns[col_idx]
+        cache = root._cast_caches.get(col_name)
+        if caster is not None or cache is None or cache.col_type != col_type:
+            cache = CastCache(caster or make_caster(col_type), col_type)
+            root._cast_caches[col_name] = cache
+        return cache.map(values)
+    
+    def cast_cache_stats(self):
+        """Статистика кешей приведения: {колонка: {hits, misses, hit_rate, cached, enabled}}"""
+        root = self._parent if self._parent is not None else self
+        return {col: cache.stats() for col, cache in root._cast_caches.items()}
+    
+    def _category_column(self, col_idx):
+        """CategoryColumn колонки корневой таблицы при колоночном хранении, иначе None"""
+        root = self._parent if self._parent is not None else self
+        getter = getattr(root._data, 'category_column', None)
+        return getter(col_idx) if getter is not None else None
+    
+    def get_categories(self, column=0):
+        """Категории колонки в порядке их кодов (первого появления)"""
+        col_idx = self._resolve_column(column)
+        if self._type_vec[col_idx] != 'category':
+            raise TableError(f"Column {self._columns[col_idx]} is not a category column")
+        category = self._category_column(col_idx)
+        if category is not None and self._parent is None:
+            return list(category.categories)
+        return list(dict.fromkeys(v for v in self.get_values(col_idx) if v is not None))
+    
+    def _build_column_store(self, rows):
+        return ColumnStore.from_rows(rows, self._type_vec)
+    
+    @property
+    def storage(self):
+        """Способ хранения данных: 'rows' или 'columns'"""
+        root = self._parent if self._parent is not None else self
+        return 'columns' if isinstance(root._data, ColumnStore) else 'rows'
+    
+    def set_storage(self, storage):
+        """Переводит таблицу в построчное ('rows') или колоночное ('columns') хранение"""
+        if storage not in STORAGES:
+            raise TableError(f"Unknown storage: {storage}")
+        self._ensure_copy()
+        if storage == self.storage:
+            return
+        if storage == 'columns':
+            self._data = self._build_column_store(self._data)
+        else:
+            self._data = [list(row) for row in self._data]
+    
+    def compact(self):
+        """Склеивает сегменты (например, загруженные из нескольких pickle) в один список строк"""
+        root = self._parent if self._parent is not None else self
+        compact = getattr(root._data, 'compact', None)
+        if compact is not None:
+            root._data = compact()
+    
+    def _read_column(self, col_idx):
+        """Список хранимых (без приведения) значений колонки"""
+        reader = getattr(self._data, 'read_column', None)
+        if reader is not None:
+            return reader(col_idx)
+        return [row[col_idx] for row in self._data]
     
+    def _cast_lazily(self, col_idx, caster):
+        """Передает приведение колонки ленивому хранилищу (оно приводит при разборе строк)"""
+        setter = getattr(self._data, 'set_caster', None)
+        return setter is not None and setter(col_idx, caster)
+    
+    def _write_column(self, col_idx, values, col_type=None):
+        """Записывает в хранилище уже приведенные значения колонки"""
+        writer = getattr(self._data, 'write_column', None)
+        if writer is not None:
+            writer(col_idx, values, col_type=col_type)
+            return
+        for row, value in zip(self._data, values):
+            row[col_idx] = value
+    
+    @instrumented('normalize_data')
     def _normalize_data(self):
-        """Выравнивает строки по количеству колонок"""
-        for i in range(len(self._data)):
-            while len(self._data[i]) < len(self._columns):
-                self._data[i].append(None)
-            if len(self._data[i]) > len(self._columns):
-                self._data[i] = self._data[i][:len(self._columns)]
+        """Выравнивает строки по количеству колонок (одна операция на строку)"""
+        width = len(self._columns)
+        padding = [None] * width
+        for row in self._data:
+            n = len(row)
+            if n < width:
+                row.extend(padding[n:])
+            elif n > width:
+                del row[width:]
     
     def _ensure_copy(self):
         """Создает копию, если это представление"""
         if self._parent is not None:
-            self._data = [list(row) for row in self._data]
+            rows = [list(row) for row in self._data]
+            columnar = self.storage == 'columns'
             self._parent = None
+            self._positions = None
+            self._local_positions = None
+            self._key_index = None
+            self._columns = list(self._columns)
+            self._column_types = dict(self._column_types)
+            self._col_pos = dict(self._col_pos)
+            self._type_vec = list(self._type_vec)
+            self._typed = set(self._typed)
+            self._cast_caches = {}
+            self._indexes = {}
+            self._data = self._build_column_store(rows) if columnar else rows
+    
+    def _make_view(self, positions):
+        """Создает представление над строками с номерами positions (range - за O(1))"""
+        root = self._parent if self._parent is not None else self
+        if self._positions is not None:
+            if isinstance(positions, range):
+                positions = self._positions[positions.start:positions.stop:positions.step]
+            else:
+                positions = [self._positions[i] for i in positions]
+        view = Table(parent=root)
+        if root._views is None:
+            root._views = weakref.WeakSet()
+        root._views.add(view)
+        # Схема общая с корневой таблицей до первого изменения схемы
+        view._columns = root._columns
+        view._column_types = root._column_types
+        view._col_pos = root._col_pos
+        view._type_vec = root._type_vec
+        view._typed = root._typed
+        view._data = RowView(root, positions)
+        view._positions = positions
+        return view
+    
+    def _get_key_index(self):
+        """Индекс первой колонки, общий для таблицы и ее представлений"""
+        root = self._parent if self._parent is not None else self
+        if root._key_index is None:
+            category = root._category_column(0)
+            if category is not None:
+                root._key_index = KeyIndex.from_codes(category.values, category.categories)
+            else:
+                root._key_index = KeyIndex(root._read_column(0))
+        return root._key_index
+    
+    def _find_by_index(self, values):
+        """Номера строк этой таблицы, найденные через индекс"""
+        return self._local_rows(self._get_key_index().lookup(*values))
     
     def _detect_cell_type(self, value):
         """Определяет тип одной ячейки"""
-        if value is None or value == '':
-            return 'none'
-        
-        if isinstance(value, bool):
-            return 'bool'
-        
-        if isinstance(value, str):
-            lower_val = value.lower().strip()
-            if lower_val in ('true', 'false', 'yes', 'no', '1', '0'):
-                return 'bool'
-            
-            try:
-                int_val = int(value)
-                if '.' not in value:
-                    return 'int'
-            except:
-                try:
-                    float(value)
-                    return 'float'
-                except:
-                    pass
-            
-            # Проверка на дату
-            date_formats = ['%Y-%m-%d', '%d.%m.%Y', '%Y/%m/%d', 
-                          '%Y-%m-%d %H:%M:%S', '%d.%m.%Y %H:%M:%S']
-            for fmt in date_formats:
-                try:
-                    datetime.strptime(value, fmt)
-                    return 'datetime'
-                except:
-                    continue
-        
-        if isinstance(value, (int, float, datetime)):
-            return type(value).__name__
-        
-        return 'str'
+        return detect_cell(value)[0]
     
     def _cast_cell(self, value, target_type):
         """Приводит ячейку к целевому типу"""
-        if target_type == 'none' or value is None or value == '':
-            return None
-        
-        if target_type == 'str':
-            return str(value)
-        
-        if target_type == 'int':
-            try:
-                return int(float(value))
-            except:
-                return None
-        
-        if target_type == 'float':
-            try:
-                return float(value)
-            except:
-                return None
-        
-        if target_type == 'bool':
-            if isinstance(value, bool):
-                return value
-            if isinstance(value, str):
-                lower_val = value.lower().strip()
-                if lower_val in ('true', '1', 'yes', 't', 'y'):
-                    return True
-                elif lower_val in ('false', '0', 'no', 'f', 'n'):
-                    return False
-            try:
-                return bool(int(value))
-            except:
-                return bool(value)
-        
-        if target_type == 'datetime':
-            if isinstance(value, datetime):
-                return value
-            if isinstance(value, str):
-                formats = ['%Y-%m-%d', '%d.%m.%Y', '%Y/%m/%d', 
-                          '%Y-%m-%d %H:%M:%S', '%d.%m.%Y %H:%M:%S']
-                for fmt in formats:
-                    try:
-                        return datetime.strptime(value.strip(), fmt)
-                    except:
-                        continue
-            return None
-        
-        return value
+        return cast_cell(value, target_type)
     
     # === ОСНОВНЫЕ МЕТОДЫ ===
     
+    @instrumented('get_rows_by_number')
     def get_rows_by_number(self, start, stop=None, copy_table=False):
         """Получение строк по номеру"""
         if not 0 <= start < len(self._data):
@@ -131,129 +304,347 @@ class Table:
         if stop is not None:
             if not 0 <= stop <= len(self._data) or stop <= start:
                 raise TableError(f"Invalid stop index: {stop}")
-            selected = self._data[start:stop]
         else:
-            selected = [self._data[start]]
+            stop = start + 1
         
         if copy_table:
-            return Table(copy.deepcopy(selected), self._columns, self._column_types)
+            return self._copy_with(copy.deepcopy(self._data[start:stop]))
         else:
-            return Table(selected, self._columns, self._column_types, parent=self)
+            return self._make_view(range(start, stop))
     
-    def get_rows_by_index(self, *values, copy_table=False):
+    @instrumented('get_rows_by_index')
+    def get_rows_by_index(self, *values, copy_table=False, use_index=True):
         """Получение строк по значениям в первой колонке"""
         if not values:
             raise TableError("No values provided")
         
-        selected = []
-        for row in self._data:
-            if row and row[0] is not None and str(row[0]) in [str(v) for v in values]:
-                selected.append(row)
+        if use_index and self._columns:
+            positions = self._find_by_index(values)
+        else:
+            keys = {str(v) for v in values}
+            positions = [i for i, row in enumerate(self._data)
+                         if row and row[0] is not None and str(row[0]) in keys]
+        return self._rows_result(positions, copy_table, values)
+    
+    def create_index(self, column, kind='sorted'):
+        """Сортированный индекс по приведенной колонке для поиска по диапазону и префиксу.
         
-        if not selected:
+        Индекс принадлежит исходной таблице и обновляется при set_values и добавлении строк.
+        """
+        if kind != 'sorted':
+            raise TableError(f"Unknown index kind: {kind}")
+        root = self._parent if self._parent is not None else self
+        col_idx = self._resolve_column(column)
+        col_name = self._columns[col_idx]
+        if self._type_vec[col_idx] not in SORTED_INDEX_TYPES:
+            raise TableError(f"Column {col_name} of type {self._type_vec[col_idx]} can't be indexed")
+        if col_name not in root._typed:
+            raise TableError(f"Column {col_name} must be typed with set_column_types first")
+        try:
+            root._indexes[col_name] = SortedIndex(root._read_column(col_idx))
+        except TypeError:
+            raise TableError(f"Column {col_name} has values that can't be compared")
+    
+    def drop_index(self, column):
+        """Удаляет сортированный индекс колонки"""
+        root = self._parent if self._parent is not None else self
+        root._indexes.pop(self._columns[self._resolve_column(column)], None)
+    
+    def _sorted_index(self, col_idx):
+        root = self._parent if self._parent is not None else self
+        return root._indexes.get(self._columns[col_idx])
+    
+    def _local_rows(self, positions):
+        """Номера строк этой таблицы для позиций в исходной таблице (по возрастанию)"""
+        if self._positions is None:
+            return positions
+        if isinstance(self._positions, range):
+            window = self._positions
+            return [window.index(p) for p in positions if p in window]
+        if self._local_positions is None:
+            self._local_positions = {p: i for i, p in enumerate(self._positions)}
+        local = self._local_positions
+        return sorted(local[p] for p in positions if p in local)
+    
+    def _rows_result(self, positions, copy_table, values):
+        if not positions:
             raise TableError(f"No rows found with values: {values}")
-        
         if copy_table:
-            return Table(copy.deepcopy(selected), self._columns, self._column_types)
+            selected = [self._data[i] for i in positions]
+            return self._copy_with(copy.deepcopy(selected))
+        return self._make_view(positions)
+    
+    @instrumented('get_rows_by_range')
+    def get_rows_by_range(self, column, low=None, high=None, include_low=True,
+                          include_high=True, copy_table=False):
+        """Строки, значение колонки которых между low и high (None - без границы).
+        
+        Использует сортированный индекс колонки (create_index), без него - просмотр колонки.
+        """
+        col_idx = self._resolve_column(column)
+        caster = make_caster(self._type_vec[col_idx])
+        bounds = []
+        for value in (low, high):
+            cast = None if value is None else caster(value)
+            # Неприводимая граница - ошибка, а не отсутствие границы (как в where)
+            if cast is None and value is not None and value != '':
+                raise TableError(f"Value {value!r} can't be compared with column "
+                                 f"{self._columns[col_idx]} of type {self._type_vec[col_idx]}")
+            bounds.append(cast)
+        low, high = bounds
+        index = self._sorted_index(col_idx)
+        if index is not None:
+            positions = self._local_rows(index.range(low, high, include_low, include_high))
+        else:
+            positions = [i for i, v in enumerate(self.get_values(col_idx))
+                         if v is not None
+                         and (low is None or (v >= low if include_low else v > low))
+                         and (high is None or (v <= high if include_high else v < high))]
+        return self._rows_result(positions, copy_table, (low, high))
+    
+    @instrumented('get_rows_by_prefix')
+    def get_rows_by_prefix(self, column, prefix, copy_table=False):
+        """Строки, строковое значение колонки которых начинается с prefix"""
+        col_idx = self._resolve_column(column)
+        if self._type_vec[col_idx] not in ('str', 'category'):
+            raise TableError(f"Column {self._columns[col_idx]} is not a string column")
+        index = self._sorted_index(col_idx)
+        if index is not None:
+            positions = self._local_rows(index.prefix(prefix))
         else:
-            return Table(selected, self._columns, self._column_types, parent=self)
+            positions = [i for i, v in enumerate(self.get_values(col_idx))
+                         if v is not None and v.startswith(prefix)]
+        return self._rows_result(positions, copy_table, (prefix,))
     
+    def _copy_with(self, rows):
+        """Независимая таблица с той же схемой над строками rows"""
+        table = Table(rows, self._columns, self._column_types, storage=self.storage)
+        table._typed = set(self._typed)
+        return table
+
+    # === ЗАПРОСЫ ===
+
+    def query(self):
+        """Пустой ленивый план запроса к таблице"""
+        from .query import Query
+        return Query(self)
+
+    def where(self, column, op, value):
+        """Фильтр строк: where('price', '>', 10).where(...).execute()"""
+        return self.query().where(column, op, value)
+
+    def select(self, *columns):
+        """Проекция на колонки (ленивый план)"""
+        return self.query().select(*columns)
+
+    def sort_by(self, column, descending=False):
+        """Сортировка по колонке (ленивый план)"""
+        return self.query().sort_by(column, descending)
+
+    def limit(self, n):
+        """Первые n строк (ленивый план)"""
+        return self.query().limit(n)
+
+    def group_by(self, *columns):
+        """Группировка: group_by('Tag').agg('count', ('Price', 'sum'))"""
+        from .groupby import GroupBy
+        return GroupBy(self, columns)
+
+    def join(self, other, on, how='inner', right_on=None, suffix='_right'):
+        """Соединение с другой таблицей по ключевым колонкам (how='inner' или 'left')"""
+        from .join import join
+        return join(self, other, on, how=how, right_on=right_on, suffix=suffix)
+
     def get_column_types(self, by_number=True):
         """Получение типов колонок"""
-        result = {}
-        for i, col in enumerate(self._columns):
-            key = i if by_number else col
-            result[key] = self._column_types.get(col, 'str')
-        return result
+        if by_number:
+            return dict(enumerate(self._type_vec))
+        return dict(zip(self._columns, self._type_vec))
+    
+    def _cast_parallel(self, jobs, workers):
+        """Приводит колонки в процессах; jobs - {номер колонки: (значения, тип, формат даты)}.
+        
+        В процессы передаются только срезы значений колонок, высокие колонки делятся
+        на блоки строк. Приведенные блоки склеиваются и записываются без повторного приведения.
+        """
+        n_rows = len(self._data)
+        if not jobs or not n_rows:
+            return
+        # Колонок меньше, чем процессов - каждая делится на несколько блоков
+        per_column = -(-workers // len(jobs))
+        block = max(1, min(PARALLEL_BLOCK_ROWS, -(-n_rows // per_column)))
+        n_blocks = -(-n_rows // block)
+        parts = {col_idx: [] for col_idx in jobs}
+        
+        def collect(col_idx, future):
+            blocks = parts[col_idx]
+            blocks.append(future.result())
+            if len(blocks) == n_blocks:
+                casted = blocks[0] if n_blocks == 1 else list(chain.from_iterable(blocks))
+                del parts[col_idx]
+                self._write_column(col_idx, casted, jobs[col_idx][1])
+        
+        # В очереди не больше двух задач на процесс: срезы не копируются все сразу
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for col_idx, (values, col_type, fmt) in jobs.items():
+                for start in range(0, n_rows, block):
+                    future = executor.submit(cast_block, values[start:start + block], col_type, fmt)
+                    pending.append((col_idx, future))
+                    if len(pending) >= 2 * workers:
+                        collect(*pending.popleft())
+            while pending:
+                collect(*pending.popleft())
     
-    def set_column_types(self, types_dict, by_number=True):
-        """Установка типов колонок"""
+    @instrumented('set_column_types')
+    def set_column_types(self, types_dict, by_number=True, workers=None):
+        """Установка типов колонок (workers > 1 - приведение в нескольких процессах)"""
         self._ensure_copy()
+        parallel = workers is not None and workers > 1 and len(self._data) > 1
+        jobs = {}
         
         for key, col_type in types_dict.items():
             if by_number:
-                if not 0 <= key < len(self._columns):
+                if not isinstance(key, int) or not 0 <= key < len(self._columns):
                     raise TableError(f"Invalid column index: {key}")
-                col_name = self._columns[key]
+                col_idx = key
             else:
-                if key not in self._columns:
+                col_idx = self._col_pos.get(key)
+                if col_idx is None:
                     raise TableError(f"Column not found: {key}")
-                col_name = key
+            col_name = self._columns[col_idx]
             
-            if col_type not in ('int', 'float', 'bool', 'str', 'datetime', 'none'):
+            if col_type not in TYPES:
                 raise TableError(f"Invalid type: {col_type}")
             
-            self._column_types[col_name] = col_type
+            self._set_column_type(col_idx, col_type)
             
             # Применяем тип ко всем ячейкам
-            col_idx = self._columns.index(col_name)
-            for row in self._data:
-                if col_idx < len(row):
-                    row[col_idx] = self._cast_cell(row[col_idx], col_type)
+            if col_idx == 0:
+                self._key_index = None
+            if self._cast_lazily(col_idx, make_caster(col_type)):
+                self._typed.add(col_name)
+                continue
+            if parallel:
+                if col_idx in jobs:
+                    # Повторный тип той же колонки применяется к уже приведенным значениям
+                    self._cast_parallel(jobs, workers)
+                    jobs = {}
+                jobs[col_idx] = (self._read_column(col_idx), col_type, None)
+            else:
+                casted = self._cast_values(col_idx, self._read_column(col_idx))
+                self._write_column(col_idx, casted, col_type)
+            self._typed.add(col_name)
+        if jobs:
+            self._cast_parallel(jobs, workers)
     
-    def auto_detect_column_types(self, samples=10):
-        """Автоматическое определение типов"""
+    def _infer_lazily(self, inferences, picked=None):
+        """Один проход по строкам ленивого хранилища (или по выбранным строкам) для всех колонок"""
+        rows = iter(self._data) if picked is None else (self._data[i] for i in picked)
+        while True:
+            active = [(col_idx, inference) for col_idx, inference in enumerate(inferences)
+                      if not inference.done]
+            block = list(islice(rows, APPEND_BATCH_ROWS)) if active else None
+            if not block:
+                return
+            for col_idx, inference in active:
+                inference.update([row[col_idx] for row in block])
+    
+    @instrumented('auto_detect_column_types')
+    def auto_detect_column_types(self, samples=None, categories=False, workers=None,
+                                 inference='head'):
+        """Автоматическое определение типов (categories=True - строковые колонки
+        с малым числом различных значений получают тип 'category';
+        workers > 1 - приведение в нескольких процессах).
+        
+        inference='head' - тип по первым samples строкам (по умолчанию 10);
+        'full' - потоковый просмотр всей колонки с расширением типа;
+        'reservoir' - то же по случайной выборке samples строк (по умолчанию RESERVOIR_ROWS).
+        В режимах 'full' и 'reservoir' возвращает {номер колонки: отчет TypeInference.report()};
+        в 'reservoir' счетчики отчета относятся к выборке, а estimated_none_cells -
+        оценка числа None во всей колонке.
+        """
+        if inference not in INFERENCE_MODES:
+            raise TableError(f"Unknown inference mode: {inference}")
+        if samples is None:
+            samples = RESERVOIR_ROWS if inference == 'reservoir' else HEAD_SAMPLES
         self._ensure_copy()
+        # Ленивое хранилище (open_csv) не разбирается целиком: берется только образец
+        lazy = getattr(self._data, 'is_lazy', False)
+        parallel = workers is not None and workers > 1 and len(self._data) > 1
+        jobs = {}
+        
+        inferences = None
+        picked = None
+        if inference != 'head':
+            inferences = [TypeInference() for _ in self._columns]
+            if inference == 'reservoir':
+                # Одна воспроизводимая выборка строк для всех колонок
+                n_rows = len(self._data)
+                picked = sorted(random.Random(0).sample(range(n_rows), min(samples, n_rows)))
+            if lazy:
+                self._infer_lazily(inferences, picked)
         
         for col_idx in range(len(self._columns)):
             col_name = self._columns[col_idx]
+            if lazy:
+                column = [row[col_idx] for row in self._data[:samples]]
+            else:
+                column = self._read_column(col_idx)
             
-            # Собираем образцы
-            sample_types = []
-            for i in range(min(samples, len(self._data))):
-                if col_idx < len(self._data[i]):
-                    val = self._data[i][col_idx]
-                    if val is not None and val != '':
-                        sample_types.append(self._detect_cell_type(val))
-            
-            if not sample_types:
-                col_type = 'str'
+            if inferences is None:
+                # Тип и формат даты определяются по образцу за один проход
+                col_type, fmt = detect_column_type(column[:samples])
             else:
-                # Считаем частоту типов
-                type_counts = {}
-                for t in sample_types:
-                    if t != 'none':
-                        type_counts[t] = type_counts.get(t, 0) + 1
-                
-                if not type_counts:
-                    col_type = 'str'
-                else:
-                    # Приоритет: datetime > int > float > bool > str
-                    priority = {'datetime': 5, 'int': 4, 'float': 3, 'bool': 2, 'str': 1}
-                    col_type = max(type_counts.keys(), 
-                                  key=lambda t: (type_counts[t], priority.get(t, 0)))
+                if not lazy:
+                    inferences[col_idx].update(
+                        column if picked is None else [column[i] for i in picked])
+                col_type, fmt = inferences[col_idx].result()
+            if categories and col_type == 'str' and is_categorical(column):
+                col_type = 'category'
             
-            self._column_types[col_name] = col_type
+            self._set_column_type(col_idx, col_type)
+            if col_idx == 0:
+                self._key_index = None
             
-            # Применяем тип
-            for row in self._data:
-                if col_idx < len(row):
-                    row[col_idx] = self._cast_cell(row[col_idx], col_type)
-    
-    def get_values(self, column=0):
-        """Получение значений колонки"""
-        if isinstance(column, int):
-            if not 0 <= column < len(self._columns):
-                raise TableError(f"Invalid column index: {column}")
-            col_name = self._columns[column]
-        elif isinstance(column, str):
-            if column not in self._columns:
-                raise TableError(f"Column not found: {column}")
-            col_name = column
-        else:
-            raise TableError("Column must be int or str")
-        
-        col_type = self._column_types.get(col_name, 'str')
-        col_idx = self._columns.index(col_name)
-        
-        values = []
-        for row in self._data:
-            if col_idx < len(row):
-                values.append(self._cast_cell(row[col_idx], col_type))
+            # Применяем тип, переиспользуя найденный формат даты
+            caster = make_caster(col_type, fmt)
+            if self._cast_lazily(col_idx, caster):
+                self._typed.add(col_name)
+                continue
+            if parallel:
+                jobs[col_idx] = (column, col_type, fmt)
             else:
-                values.append(None)
+                casted = self._cast_values(col_idx, column, caster)
+                self._write_column(col_idx, casted, col_type)
+            self._typed.add(col_name)
+        if jobs:
+            self._cast_parallel(jobs, workers)
+        if inferences is None:
+            return None
+        reports = {col_idx: inf.report() for col_idx, inf in enumerate(inferences)}
+        if picked is not None:
+            # Счетчики отчета - по выборке; число None для всей колонки оценивается по ее доле
+            for report in reports.values():
+                share = report['none_cells'] / report['scanned'] if report['scanned'] else 0.0
+                report['estimated_none_cells'] = round(share * len(self._data))
+        return reports
+    
+    @instrumented('get_values')
+    def get_values(self, column=0, copy=True):
+        """Получение значений колонки (copy=False - неизменяемое представление без копирования)"""
+        col_idx = self._resolve_column(column)
+        col_name = self._columns[col_idx]
+        col_type = self._type_vec[col_idx]
         
-        return values
+        # Уже приведенные значения не нужно приводить повторно
+        caster = None if col_name in self._typed else make_caster(col_type)
+        if not copy:
+            return ColumnView(self, col_idx, caster)
+        values = self._read_column(col_idx)
+        if caster is None:
+            return values
+        return [caster(v) for v in values]
     
     def get_value(self, column=0):
         """Получение значения из таблицы с одной строкой"""
@@ -262,65 +653,146 @@ class Table:
         return self.get_values(column)[0]
     
     def set_values(self, values, column=0):
-        """Установка значений колонки"""
-        self._ensure_copy()
-        
+        """Установка значений колонки (через представление - в строки исходной таблицы)"""
         if len(values) != len(self._data):
             raise TableError(f"Values count ({len(values)}) doesn't match row count ({len(self._data)})")
         
-        if isinstance(column, int):
-            col_name = self._columns[column]
-        else:
-            col_name = column
-        
-        col_type = self._column_types.get(col_name, 'str')
-        col_idx = self._columns.index(col_name)
+        col_idx = self._resolve_column(column)
+        col_name = self._columns[col_idx]
+        col_type = self._type_vec[col_idx]
+        casted = self._cast_values(col_idx, values)
         
-        for i, value in enumerate(values):
-            casted = self._cast_cell(value, col_type)
-            while len(self._data[i]) <= col_idx:
-                self._data[i].append(None)
-            self._data[i][col_idx] = casted
+        root = self._parent if self._parent is not None else self
+        indexes = [root._indexes[col_name]] if col_name in root._indexes else []
+        if col_idx == 0 and root._key_index is not None:
+            indexes.append(root._key_index)
+        small = len(casted) <= INDEX_UPDATE_ROWS
+        if indexes and small:
+            positions = self._positions if self._positions is not None else range(len(casted))
+            old_values = self._read_column(col_idx)
+            for index in indexes:
+                for pos, old, new in zip(positions, old_values, casted):
+                    index.update(pos, old, new)
+        self._write_column(col_idx, casted, col_type)
+        if indexes and not small:
+            # Большую запись дешевле переиндексировать целиком, чем обновлять по строкам;
+            # индекс первой колонки строится заново при следующем поиске
+            if col_idx == 0:
+                root._key_index = None
+            if col_name in root._indexes:
+                root._indexes[col_name] = SortedIndex(root._read_column(col_idx))
+        if self._parent is None:
+            # Через представление записана только часть колонки
+            self._typed.add(col_name)
     
     def set_value(self, value, column=0):
         """Установка значения в таблице с одной строкой"""
         if len(self._data) != 1:
             raise TableError("Table must have exactly one row")
         self.set_values([value], column)
-    
+
+    # === ДОБАВЛЕНИЕ СТРОК ===
+
+    def _prepare_rows(self, rows):
+        """Копии строк, выровненные по колонкам; приведенные колонки приводятся пачкой"""
+        width = len(self._columns)
+        padding = [None] * width
+        casters = [(i, make_caster(self._type_vec[i])) for i, col in enumerate(self._columns)
+                   if col in self._typed]
+        batch = []
+        for row in rows:
+            row = list(row)
+            n = len(row)
+            if n < width:
+                row.extend(padding[n:])
+            elif n > width:
+                del row[width:]
+            batch.append(row)
+        for i, caster in casters:
+            for row in batch:
+                row[i] = caster(row[i])
+        return batch
+
+    def _shift_views(self, at, count):
+        """Сдвигает номера строк представлений после вставки count строк в позицию at"""
+        for view in list(self._views or ()):
+            if view._parent is not self:
+                continue
+            positions = view._positions
+            if isinstance(positions, range) and positions.step == 1 and positions.stop <= at:
+                continue
+            if isinstance(positions, range) and positions.step == 1 and positions.start >= at:
+                positions = range(positions.start + count, positions.stop + count)
+            else:
+                positions = [p + count if p >= at else p for p in positions]
+            view._positions = positions
+            view._data._positions = positions
+            view._local_positions = None
+
+    def extend_rows(self, rows):
+        """Добавляет строки в конец таблицы (rows - любой итерируемый объект, в т.ч. генератор).
+
+        Добавление в представление отделяет его от исходной таблицы.
+        """
+        if not self._columns:
+            raise TableError("Table has no columns")
+        self._ensure_copy()
+        iterator = iter(rows)
+        while True:
+            batch = self._prepare_rows(islice(iterator, APPEND_BATCH_ROWS))
+            if not batch:
+                break
+            start = len(self._data)
+            self._data.extend(batch)
+            if self._key_index is not None:
+                for pos, row in enumerate(batch, start):
+                    self._key_index.update(pos, None, row[0])
+            for col_name, index in self._indexes.items():
+                col_idx = self._col_pos[col_name]
+                if len(batch) > INDEX_UPDATE_ROWS:
+                    self._indexes[col_name] = SortedIndex(self._read_column(col_idx))
+                    continue
+                for pos, row in enumerate(batch, start):
+                    index.update(pos, None, row[col_idx])
+
+    def append_row(self, row):
+        """Добавляет одну строку в конец таблицы"""
+        self.extend_rows((row,))
+
+    def insert_rows(self, at, rows):
+        """Вставляет строки перед строкой с номером at"""
+        if not self._columns:
+            raise TableError("Table has no columns")
+        self._ensure_copy()
+        if not 0 <= at <= len(self._data):
+            raise TableError(f"Invalid insert position: {at}")
+        batch = self._prepare_rows(rows)
+        if not batch:
+            return
+        if isinstance(self._data, list):
+            self._data[at:at] = batch
+        else:
+            # Колоночное и сегментированное хранилища перестраиваются
+            columnar = self.storage == 'columns'
+            data = list(self._data)
+            data[at:at] = batch
+            self._data = self._build_column_store(data) if columnar else data
+        # Номера строк после at сдвинулись
+        self._key_index = None
+        for col_name in self._indexes:
+            self._indexes[col_name] = SortedIndex(self._read_column(self._col_pos[col_name]))
+        self._shift_views(at, len(batch))
+
     def print_table(self, max_rows=20):
         """Вывод таблицы"""
         if not self._data:
             print("Empty table")
             return
         
-        # Определяем ширину колонок
-        widths = []
-        for i, col in enumerate(self._columns):
-            width = len(str(col))
-            for j in range(min(max_rows, len(self._data))):
-                if i < len(self._data[j]):
-                    cell = str(self._data[j][i])
-                    width = max(width, len(cell))
-            widths.append(min(width, 30))
-        
-        # Заголовок
-        header = " | ".join(f"{col:<{widths[i]}}" for i, col in enumerate(self._columns))
-        print(header)
-        print("-" * len(header))
-        
-        # Данные
-        for j in range(min(max_rows, len(self._data))):
-            row_parts = []
-            for i in range(len(self._columns)):
-                if i < len(self._data[j]):
-                    cell = str(self._data[j][i])[:30]
-                    row_parts.append(f"{cell:<{widths[i]}}")
-                else:
-                    row_parts.append(" " * widths[i])
-            print(" | ".join(row_parts))
+        for line in render_lines(self, max_rows):
+            print(line)
         
-        if len(self._data) > max_rows:
+        if max_rows is not None and len(self._data) > max_rows:
             print(f"... and {len(self._data) - max_rows} more rows")
     
     def __repr__(self):
@@ -0,0 +1,485 @@
+import re
+import sys
+from collections import OrderedDict
+from datetime import datetime
+
+TYPES = ('int', 'float', 'bool', 'str', 'datetime', 'none', 'category')
+
+DATE_FORMATS = ['%Y-%m-%d', '%d.%m.%Y', '%Y/%m/%d',
+                '%Y-%m-%d %H:%M:%S', '%d.%m.%Y %H:%M:%S']
+
+# Форма строки для каждого формата даты: strptime вызывается только при совпадении
+_DATE_SHAPES = {
+    '%Y-%m-%d': re.compile(r'\d{4}-\d{1,2}-\d{1,2}'),
+    '%d.%m.%Y': re.compile(r'\d{1,2}\.\d{1,2}\.\d{4}'),
+    '%Y/%m/%d': re.compile(r'\d{4}/\d{1,2}/\d{1,2}'),
+    '%Y-%m-%d %H:%M:%S': re.compile(r'\d{4}-\d{1,2}-\d{1,2}\s+\d{1,2}:\d{1,2}:\d{1,2}'),
+    '%d.%m.%Y %H:%M:%S': re.compile(r'\d{1,2}\.\d{1,2}\.\d{4}\s+\d{1,2}:\d{1,2}:\d{1,2}'),
+}
+# Строгий ISO вид разбирается datetime.fromisoformat без strptime
+_ISO_RE = re.compile(r'\d{4}-\d{2}-\d{2}(?: \d{2}:\d{2}:\d{2})?')
+
+_DIGITS = r'\d(?:_?\d)*'
+_INT_RE = re.compile(r'\s*[+-]?' + _DIGITS + r'\s*')
+_FLOAT_RE = re.compile(
+    r'\s*[+-]?(?:(?:(?:{d})?\.{d}|{d}\.?)(?:[eE][+-]?{d})?|inf(?:inity)?|nan)\s*'.format(d=_DIGITS),
+    re.IGNORECASE)
+
+_BOOL_LITERALS = {'true', 'false', 'yes', 'no', '1', '0'}
+_TRUE_LITERALS = {'true', '1', 'yes', 't', 'y'}
+_FALSE_LITERALS = {'false', '0', 'no', 'f', 'n'}
+
+# Приоритет при равной частоте: datetime > int > float > bool > str
+_PRIORITY = {'datetime': 5, 'int': 4, 'float': 3, 'bool': 2, 'str': 1}
+
+
+def parse_datetime(value, fmt):
+    """Разбирает строку в формате fmt; None, если строка не подходит"""
+    if _DATE_SHAPES[fmt].fullmatch(value) is None:
+        return None
+    if fmt in ('%Y-%m-%d', '%Y-%m-%d %H:%M:%S') and _ISO_RE.fullmatch(value):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    try:
+        return datetime.strptime(value, fmt)
+    except ValueError:
+        return None
+
+
+def match_datetime(value, hint=None):
+    """Возвращает (datetime, формат) для строки или (None, None)"""
+    if hint is not None:
+        parsed = parse_datetime(value, hint)
+        if parsed is not None:
+            return parsed, hint
+    for fmt in DATE_FORMATS:
+        if fmt != hint:
+            parsed = parse_datetime(value, fmt)
+            if parsed is not None:
+                return parsed, fmt
+    return None, None
+
+
+def detect_cell(value, hint=None):
+    """Определяет тип одной ячейки: возвращает (тип, формат даты или None)"""
+    if value is None or value == '':
+        return 'none', None
+
+    if isinstance(value, bool):
+        return 'bool', None
+
+    if isinstance(value, str):
+        if value.lower().strip() in _BOOL_LITERALS:
+            return 'bool', None
+        if _INT_RE.fullmatch(value):
+            return 'int', None
+        if _FLOAT_RE.fullmatch(value):
+            return 'float', None
+        parsed, fmt = match_datetime(value, hint)
+        if parsed is not None:
+            return 'datetime', fmt
+        return 'str', None
+
+    if isinstance(value, (int, float, datetime)):
+        return type(value).__name__, None
+
+    return 'str', None
+
+
+def detect_column_type(values, default='str'):
+    """Определяет тип колонки по образцу за один проход: возвращает (тип, формат даты)"""
+    type_counts = {}
+    formats = {}
+    hint = None
+    for value in values:
+        if value is None or value == '':
+            continue
+        cell_type, fmt = detect_cell(value, hint)
+        type_counts[cell_type] = type_counts.get(cell_type, 0) + 1
+        if fmt is not None:
+            hint = fmt
+            formats[fmt] = formats.get(fmt, 0) + 1
+
+    type_counts.pop('none', None)
+    if not type_counts:
+        return default, None
+
+    col_type = max(type_counts, key=lambda t: (type_counts[t], _PRIORITY.get(t, 0)))
+    fmt = max(formats, key=formats.get) if col_type == 'datetime' and formats else None
+    return col_type, fmt
+
+
+# === Потоковое определение типа ===
+
+# Сколько различных строк колонки запоминает TypeInference
+INFERENCE_MEMO_SIZE = 4096
+
+# Вид ячейки -> виды, при которых колонка остается данного типа;
+# 'bool01' - логическое значение, записанное как '0'/'1' (подходит и для чисел)
+_COMPATIBLE_KINDS = {
+    'bool': {'bool', 'bool01'},
+    'datetime': {'datetime'},
+    'int': {'int', 'bool01'},
+    'float': {'float', 'int', 'bool01'},
+    'str': {'str'},
+}
+# Виды ячеек, совпадающие с типом колонки без расширения ('0'/'1' - и bool, и int)
+_EXACT_KINDS = {
+    'bool': {'bool', 'bool01'},
+    'datetime': {'datetime'},
+    'int': {'int', 'bool01'},
+    'float': {'float'},
+    'str': {'str'},
+}
+
+
+def _resolve_kinds(kinds):
+    """Наименьший тип, к которому без потерь приводятся ячейки всех видов"""
+    if not kinds:
+        return None
+    for col_type in ('bool', 'datetime', 'int', 'float'):
+        if kinds <= _COMPATIBLE_KINDS[col_type]:
+            return col_type
+    return 'str'
+
+
+class TypeInference:
+    """Потоковое определение типа колонки по всем ее значениям.
+
+    Тип расширяется по мере просмотра (bool -> int -> float -> str, datetime -> str),
+    поэтому приведение к итоговому типу не превращает непустые ячейки в None.
+    Когда колонка оказалась строковой, остальные значения не просматриваются.
+    """
+
+    def __init__(self, memo_size=None):
+        self.counts = {}
+        self.formats = {}
+        self.none_cells = 0
+        self.done = False
+        self._hint = None
+        self._memo = {}
+        self._memo_size = INFERENCE_MEMO_SIZE if memo_size is None else memo_size
+
+    def _classify(self, value):
+        cell_type, fmt = detect_cell(value, self._hint)
+        if cell_type == 'bool' and (isinstance(value, bool) or value.strip() in ('0', '1')):
+            return 'bool01', None
+        if fmt is not None:
+            self._hint = fmt
+        return cell_type, fmt
+
+    def update(self, values):
+        """Учитывает следующие значения колонки; False, если колонка уже строковая"""
+        if self.done:
+            return False
+        counts = self.counts
+        formats = self.formats
+        memo = self._memo
+        # Когда тип колонки уже числовой, числа распознаются одним регулярным выражением
+        numeric = _resolve_kinds(counts.keys()) in ('int', 'float')
+        int_match = _INT_RE.fullmatch
+        float_match = _FLOAT_RE.fullmatch
+        for value in values:
+            if value is None or value == '':
+                self.none_cells += 1
+                continue
+            if type(value) is str:
+                cached = memo.get(value)
+                if cached is None and numeric:
+                    kind = 'int' if int_match(value) else 'float' if float_match(value) else None
+                    if kind is not None:
+                        # int и float вместе дают float: тип остается числовым
+                        counts[kind] = counts.get(kind, 0) + 1
+                        continue
+                if cached is None:
+                    cached = self._classify(value)
+                    if len(memo) < self._memo_size:
+                        memo[value] = cached
+                kind, fmt = cached
+            else:
+                kind, fmt = self._classify(value)
+            if fmt is not None:
+                formats[fmt] = formats.get(fmt, 0) + 1
+            n = counts.get(kind)
+            if n is not None:
+                counts[kind] = n + 1
+                continue
+            counts[kind] = 1
+            # Новый вид ячейки может расширить тип; str дальше не расширяется
+            resolved = _resolve_kinds(counts.keys())
+            if resolved == 'str':
+                self.done = True
+                return False
+            numeric = resolved in ('int', 'float')
+        return True
+
+    def result(self, default='str'):
+        """(тип, формат даты) по просмотренным значениям"""
+        col_type = _resolve_kinds(self.counts.keys()) or default
+        # Колонка из объектов datetime (уже приведенная) форматов не имеет
+        fmt = (max(self.formats, key=self.formats.get)
+               if col_type == 'datetime' and self.formats else None)
+        return col_type, fmt
+
+    def report(self, default='str'):
+        """Тип, доля непустых ячеек, совпадающих с ним без расширения (confidence:
+        99 целых и 1 дробное дают float с 0.01), число просмотренных ячеек,
+        ставших бы None (пустых), и число просмотренных ячеек
+        (stopped_early - просмотр остановлен на первой строковой ячейке)"""
+        col_type, _ = self.result(default)
+        present = sum(self.counts.values())
+        matching = sum(n for kind, n in self.counts.items()
+                       if kind in _EXACT_KINDS.get(col_type, ()))
+        return {
+            'type': col_type,
+            'confidence': matching / present if present else 0.0,
+            'none_cells': self.none_cells,
+            'scanned': present + self.none_cells,
+            'stopped_early': self.done,
+        }
+
+
+# Строковая колонка считается категориальной, если различных значений
+# не больше этой доли от непустых ячеек
+CATEGORY_MAX_RATIO = 0.5
+
+
+def is_categorical(values, max_ratio=CATEGORY_MAX_RATIO):
+    """Мало ли различных значений в колонке (для типа 'category')"""
+    try:
+        distinct = set(values)
+    except TypeError:
+        return False
+    present = len(values) - values.count(None) - values.count('')
+    distinct.discard(None)
+    distinct.discard('')
+    return present > 0 and len(distinct) <= max_ratio * present
+
+
+def widen_type(a, b):
+    """Наименьший общий тип двух типов колонки ('none' - нет данных)"""
+    if a == b or b == 'none':
+        return a
+    if a == 'none':
+        return b
+    # Образец из одних '0'/'1' определяется как bool; с числами это числовая колонка
+    if {a, b} <= {'bool', 'int', 'float'}:
+        return 'float' if 'float' in (a, b) else 'int'
+    return 'str'
+
+
+def reconcile_types(type_lists):
+    """Сводит типы колонок, определенные по частям таблицы, в один список"""
+    result = None
+    for types in type_lists:
+        result = list(types) if result is None else [widen_type(a, b) for a, b in zip(result, types)]
+    return ['str' if t == 'none' else t for t in result or []]
+
+
+# === Приведение значений ===
+
+def _cast_str(value):
+    if value is None or value == '':
+        return None
+    return str(value)
+
+
+def _cast_category(value):
+    # Одинаковые значения категории - один общий объект строки
+    if value is None or value == '':
+        return None
+    return sys.intern(str(value))
+
+
+def _cast_int(value):
+    if value is None or value == '':
+        return None
+    if type(value) is int:
+        return value
+    if type(value) is str and _INT_RE.fullmatch(value):
+        return int(value)
+    try:
+        return int(float(value))
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def _cast_float(value):
+    if value is None or value == '':
+        return None
+    if type(value) is float:
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def _cast_bool(value):
+    if value is None or value == '':
+        return None
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        lower_val = value.lower().strip()
+        if lower_val in _TRUE_LITERALS:
+            return True
+        elif lower_val in _FALSE_LITERALS:
+            return False
+    try:
+        return bool(int(value))
+    except (TypeError, ValueError, OverflowError):
+        return bool(value)
+
+
+def _cast_none(value):
+    return None
+
+
+def _cast_identity(value):
+    if value is None or value == '':
+        return None
+    return value
+
+
+class DatetimeCaster:
+    """Приведение к datetime, запоминающее последний подошедший формат"""
+
+    def __init__(self, fmt=None):
+        self.fmt = fmt
+
+    def __call__(self, value):
+        if value is None or value == '':
+            return None
+        if isinstance(value, datetime):
+            return value
+        if isinstance(value, str):
+            parsed, fmt = match_datetime(value.strip(), self.fmt)
+            if parsed is not None:
+                self.fmt = fmt
+            return parsed
+        return None
+
+
+_CASTERS = {
+    'str': _cast_str,
+    'int': _cast_int,
+    'float': _cast_float,
+    'bool': _cast_bool,
+    'none': _cast_none,
+    'category': _cast_category,
+}
+
+
+def make_caster(target_type, fmt=None):
+    """Функция приведения значений колонки к target_type"""
+    if target_type == 'datetime':
+        return DatetimeCaster(fmt)
+    return _CASTERS.get(target_type, _cast_identity)
+
+
+def cast_cell(value, target_type, fmt=None):
+    """Приводит одну ячейку к целевому типу"""
+    return make_caster(target_type, fmt)(value)
+
+
+# === Кеш приведения ===
+
+# Размер LRU на колонку (0 - кеш выключен), минимальная доля попаданий
+# и размер окна ячеек, по которому она проверяется
+CAST_CACHE = {'size': 4096, 'min_hit_rate': 0.5, 'window': 4096}
+# Типы, приведение которых дороже поиска в словаре
+CACHED_TYPES = ('int', 'float', 'bool', 'datetime', 'category')
+
+
+def configure_cast_cache(size=None, min_hit_rate=None, window=None):
+    """Меняет настройки кеша приведения для новых колонок"""
+    for key, value in (('size', size), ('min_hit_rate', min_hit_rate), ('window', window)):
+        if value is not None:
+            CAST_CACHE[key] = value
+
+
+def cast_block(values, col_type, fmt=None):
+    """Приводит блок значений колонки (задача процесса при параллельном приведении)"""
+    caster = make_caster(col_type, fmt)
+    if col_type in CACHED_TYPES:
+        return CastCache(caster, col_type).map(values)
+    return [caster(v) for v in values]
+
+
+class CastCache:
+    """LRU-кеш приведения значений одной колонки со статистикой попаданий.
+
+    Отключается сам, если в очередном окне доля попаданий ниже min_hit_rate
+    (колонка с высокой кардинальностью).
+    """
+
+    def __init__(self, caster, col_type, size=None, min_hit_rate=None, window=None):
+        self.caster = caster
+        self.col_type = col_type
+        self.size = CAST_CACHE['size'] if size is None else size
+        self.min_hit_rate = CAST_CACHE['min_hit_rate'] if min_hit_rate is None else min_hit_rate
+        self.window = CAST_CACHE['window'] if window is None else window
+        self.enabled = self.size > 0
+        self.hits = 0
+        self.misses = 0
+        self._seen = 0
+        self._window_misses = 0
+        self._values = OrderedDict()
+
+    def map(self, values):
+        """Приведенные значения в том же порядке"""
+        caster = self.caster
+        if not self.enabled:
+            return [caster(v) for v in values]
+
+        cache = self._values
+        touch = cache.move_to_end
+        size = self.size
+        result = []
+        append = result.append
+        for start in range(0, len(values), self.window):
+            chunk = values[start:start + self.window]
+            misses = 0
+            for value in chunk:
+                # Кешируются только строки: 1, True и 1.0 равны как ключи словаря,
+                # но приводятся по-разному (например, к 'category')
+                if type(value) is not str:
+                    misses += 1
+                    append(caster(value))
+                    continue
+                try:
+                    cast = cache[value]
+                    touch(value)
+                except KeyError:
+                    misses += 1
+                    cast = cache[value] = caster(value)
+                    if len(cache) > size:
+                        cache.popitem(last=False)
+                append(cast)
+            self.hits += len(chunk) - misses
+            self.misses += misses
+            # Доля попаданий проверяется по окнам, в т.ч. набранным за несколько вызовов
+            self._seen += len(chunk)
+            self._window_misses += misses
+            if self._seen >= self.window:
+                low = self._seen - self._window_misses < self.min_hit_rate * self._seen
+                self._seen = self._window_misses = 0
+                if low:
+                    self.enabled = False
+                    cache.clear()
+                    result.extend(caster(v) for v in values[start + len(chunk):])
+                    break
+        return result
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'cached': len(self._values),
+            'enabled': self.enabled,
+        }
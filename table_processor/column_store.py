@@ -0,0 +1,305 @@
+from array import array
+
+# Коды array для типов, которые хранятся в типизированных буферах
+ARRAY_CODES = {'int': 'q', 'float': 'd', 'bool': 'b'}
+_PY_TYPES = {'int': int, 'float': float, 'bool': bool}
+
+
+class TypedColumn:
+    """Колонка в буфере array с битовой картой значений None"""
+
+    __slots__ = ('kind', 'values', 'nulls', 'null_count')
+
+    def __init__(self, kind, values, nulls, null_count):
+        self.kind = kind
+        self.values = values
+        self.nulls = nulls
+        self.null_count = null_count
+
+    @classmethod
+    def pack(cls, kind, values):
+        """Упаковывает список значений; None, если значения не подходят под kind"""
+        py_type = _PY_TYPES[kind]
+        nulls = bytearray((len(values) + 7) // 8)
+        null_count = 0
+        for i, value in enumerate(values):
+            if value is None:
+                nulls[i >> 3] |= 1 << (i & 7)
+                null_count += 1
+            elif type(value) is not py_type:
+                return None
+        if null_count:
+            values = [0 if v is None else v for v in values]
+        try:
+            buffer = array(ARRAY_CODES[kind], values)
+        except OverflowError:
+            return None
+        return cls(kind, buffer, nulls, null_count)
+
+    def __len__(self):
+        return len(self.values)
+
+    def is_null(self, i):
+        return self.null_count and self.nulls[i >> 3] & (1 << (i & 7))
+
+    def get(self, i):
+        if self.is_null(i):
+            return None
+        value = self.values[i]
+        return bool(value) if self.kind == 'bool' else value
+
+    def set(self, i, value):
+        """Записывает значение; False, если оно не помещается в буфер"""
+        if value is None:
+            if not self.is_null(i):
+                self.nulls[i >> 3] |= 1 << (i & 7)
+                self.null_count += 1
+            self.values[i] = 0
+            return True
+        if type(value) is not _PY_TYPES[self.kind]:
+            return False
+        try:
+            self.values[i] = value
+        except OverflowError:
+            return False
+        if self.is_null(i):
+            self.nulls[i >> 3] &= ~(1 << (i & 7))
+            self.null_count -= 1
+        return True
+
+    def append(self, value):
+        i = len(self.values)
+        if i >> 3 >= len(self.nulls):
+            self.nulls.append(0)
+        self.values.append(0)
+        if not self.set(i, value):
+            self.values.pop()
+            return False
+        return True
+
+    def to_list(self):
+        result = self.values.tolist()
+        if self.kind == 'bool':
+            result = [bool(v) for v in result]
+        if self.null_count:
+            nulls = self.nulls
+            for i in range(len(result)):
+                if nulls[i >> 3] & (1 << (i & 7)):
+                    result[i] = None
+        return result
+
+
+class CategoryColumn:
+    """Строковая колонка как коды (array 'i', -1 - None) и словарь категорий"""
+
+    __slots__ = ('categories', 'codes', 'values')
+
+    kind = 'category'
+
+    def __init__(self, categories, values):
+        self.categories = categories
+        self.codes = {value: code for code, value in enumerate(categories)}
+        self.values = values
+
+    @classmethod
+    def pack(cls, values):
+        """Кодирует список строк; None, если в нем есть не строки"""
+        column = cls([], array('i'))
+        codes = column.codes
+        categories = column.categories
+        encoded = []
+        for value in values:
+            if value is None:
+                encoded.append(-1)
+                continue
+            if type(value) is not str:
+                return None
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(categories)
+                categories.append(value)
+            encoded.append(code)
+        column.values = array('i', encoded)
+        return column
+
+    def __len__(self):
+        return len(self.values)
+
+    def code_of(self, value):
+        """Код значения (None -> -1) или None, если такой категории нет"""
+        return -1 if value is None else self.codes.get(value)
+
+    def get(self, i):
+        code = self.values[i]
+        return None if code < 0 else self.categories[code]
+
+    def set(self, i, value):
+        """Записывает значение; False, если это не строка"""
+        if value is None:
+            code = -1
+        elif type(value) is not str:
+            return False
+        else:
+            code = self.codes.get(value)
+            if code is None:
+                code = self.codes[value] = len(self.categories)
+                self.categories.append(value)
+        self.values[i] = code
+        return True
+
+    def append(self, value):
+        self.values.append(-1)
+        if not self.set(len(self.values) - 1, value):
+            self.values.pop()
+            return False
+        return True
+
+    def to_list(self):
+        categories = self.categories
+        return [categories[code] if code >= 0 else None for code in self.values]
+
+
+# Колонки в компактном представлении (не обычные списки)
+PACKED_COLUMNS = (TypedColumn, CategoryColumn)
+
+
+class LazyColumn:
+    """Колонка, которая читается (например, из mmap) при первом обращении"""
+
+    __slots__ = ('load',)
+
+    def __init__(self, load):
+        self.load = load
+
+
+class ColumnStore:
+    """Колоночное хранилище строк таблицы.
+
+    Колонки типов int, float и bool хранятся в буферах array с битовой
+    картой None, остальные колонки - в обычных списках. Снаружи хранилище
+    ведет себя как последовательность строк, поэтому код, обходящий
+    table._data, продолжает работать (строки возвращаются копиями).
+    """
+
+    def __init__(self, columns, types):
+        self._columns = [self._pack(values, col_type) for values, col_type in zip(columns, types)]
+        self._length = len(columns[0]) if columns else 0
+
+    @classmethod
+    def from_rows(cls, rows, types):
+        """Строит хранилище из списка строк одинаковой длины"""
+        columns = [list(col) for col in zip(*rows)] if rows else [[] for _ in types]
+        store = cls(columns, types)
+        store._length = len(rows)
+        return store
+
+    @classmethod
+    def from_columns(cls, columns, length):
+        """Хранилище из готовых колонок (TypedColumn, списков или LazyColumn)"""
+        store = cls.__new__(cls)
+        store._columns = list(columns)
+        store._length = length
+        return store
+
+    def _column(self, col_idx):
+        column = self._columns[col_idx]
+        if isinstance(column, LazyColumn):
+            column = self._columns[col_idx] = column.load()
+        return column
+
+    @staticmethod
+    def _pack(values, col_type):
+        if col_type in ARRAY_CODES:
+            packed = TypedColumn.pack(col_type, values)
+            if packed is not None:
+                return packed
+        elif col_type == 'category':
+            packed = CategoryColumn.pack(values)
+            if packed is not None:
+                return packed
+        return values if isinstance(values, list) else list(values)
+
+    def _unpack(self, col_idx):
+        """Переводит колонку в обычный список (при несовместимой записи)"""
+        column = self._column(col_idx)
+        if isinstance(column, PACKED_COLUMNS):
+            column = self._columns[col_idx] = column.to_list()
+        return column
+
+    # === Протокол хранилища ===
+
+    def read_column(self, col_idx):
+        column = self._column(col_idx)
+        if isinstance(column, PACKED_COLUMNS):
+            return column.to_list()
+        return list(column)
+
+    def write_column(self, col_idx, values, col_type=None):
+        if len(values) != self._length:
+            raise ValueError("Column length doesn't match row count")
+        self._columns[col_idx] = self._pack(list(values), col_type)
+
+    def get_cell(self, row_idx, col_idx):
+        column = self._column(col_idx)
+        if isinstance(column, PACKED_COLUMNS):
+            return column.get(row_idx)
+        return column[row_idx]
+
+    def set_cell(self, row_idx, col_idx, value):
+        column = self._column(col_idx)
+        if isinstance(column, PACKED_COLUMNS) and column.set(row_idx, value):
+            return
+        self._unpack(col_idx)[row_idx] = value
+
+    def extend(self, rows):
+        for row in rows:
+            for col_idx, value in enumerate(row):
+                column = self._column(col_idx)
+                if isinstance(column, PACKED_COLUMNS) and column.append(value):
+                    continue
+                self._unpack(col_idx).append(value)
+            self._length += 1
+
+    def category_column(self, col_idx):
+        """CategoryColumn колонки или None, если колонка хранится иначе"""
+        column = self._column(col_idx)
+        return column if isinstance(column, CategoryColumn) else None
+
+    def column_kinds(self):
+        """Способ хранения каждой колонки: код array, 'category' или 'list'"""
+        kinds = []
+        for col in self._columns:
+            if isinstance(col, LazyColumn):
+                kinds.append('lazy')
+            elif isinstance(col, CategoryColumn):
+                kinds.append('category')
+            elif isinstance(col, TypedColumn):
+                kinds.append(col.values.typecode)
+            else:
+                kinds.append('list')
+        return kinds
+
+    def __getstate__(self):
+        # Ленивые колонки (например, над mmap) не сериализуются - читаем их
+        for col_idx in range(len(self._columns)):
+            self._column(col_idx)
+        return self.__dict__
+
+    # === Последовательность строк ===
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._length))]
+        if i < 0:
+            i += self._length
+        if not 0 <= i < self._length:
+            raise IndexError("row index out of range")
+        return [self.get_cell(i, c) for c in range(len(self._columns))]
+
+    def __iter__(self):
+        columns = [self.read_column(c) for c in range(len(self._columns))]
+        for row in zip(*columns):
+            yield list(row)
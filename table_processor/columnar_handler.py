@@ -0,0 +1,206 @@
+import json
+import mmap
+import pickle
+import struct
+from array import array
+from datetime import datetime, timedelta
+from .base_table import Table
+from .column_store import ARRAY_CODES, CategoryColumn, ColumnStore, LazyColumn, TypedColumn
+from .profiling import instrumented
+
+# Формат файла:
+#   MAGIC | длина заголовка (uint32 LE) | заголовок JSON | выравнивание до 8 | буферы
+# Заголовок хранит _columns, _column_types и расположение буферов каждой колонки
+# (смещения отсчитываются от начала области буферов).
+MAGIC = b'TPCOL\x01'
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _null_bitmap(values):
+    nulls = bytearray((len(values) + 7) // 8)
+    for i, value in enumerate(values):
+        if value is None:
+            nulls[i >> 3] |= 1 << (i & 7)
+    return nulls
+
+
+def _encode_column(values, col_type):
+    """Кодирует колонку: возвращает (вид, список буферов, число None)"""
+    nulls = _null_bitmap(values)
+    null_count = values.count(None)
+
+    if col_type in ARRAY_CODES:
+        packed = TypedColumn.pack(col_type, values)
+        if packed is not None:
+            return col_type, [nulls, packed.values.tobytes()], null_count
+
+    elif col_type == 'datetime':
+        if all(v is None or v.tzinfo is None for v in values):
+            micros = array('q', [0 if v is None else (v - _EPOCH) // _MICROSECOND for v in values])
+            return 'datetime', [nulls, micros.tobytes()], null_count
+
+    elif col_type == 'none':
+        return 'none', [], len(values)
+
+    elif col_type == 'category':
+        packed = CategoryColumn.pack(values)
+        if packed is not None:
+            # Коды int32 (-1 - None) и словарь категорий как строковая колонка
+            _, parts, _ = _encode_column(packed.categories, 'str')
+            return 'category', [packed.values.tobytes()] + parts[1:], null_count
+
+    elif all(v is None or isinstance(v, str) for v in values):
+        # Строки: смещения (n + 1 значений int64) и склеенные байты utf-8
+        offsets = array('q', [0])
+        chunks = []
+        total = 0
+        for value in values:
+            if value is not None:
+                encoded = value.encode('utf-8')
+                chunks.append(encoded)
+                total += len(encoded)
+            offsets.append(total)
+        return 'str', [nulls, offsets.tobytes(), b''.join(chunks)], null_count
+
+    # Значения, не помещающиеся в буферы (например, огромные int)
+    return 'pickle', [pickle.dumps(values, protocol=pickle.HIGHEST_PROTOCOL)], null_count
+
+
+@instrumented('save_columnar')
+def save_columnar(table, file_path):
+    """Сохранение в бинарный колоночный формат"""
+    n_rows = len(table._data)
+    layout = []
+    buffers = []
+    offset = 0
+    for col_idx in range(len(table._columns)):
+        col_type = table._type_vec[col_idx]
+        kind, parts, null_count = _encode_column(table.get_values(col_idx), col_type)
+        spans = []
+        for part in parts:
+            spans.append([offset, len(part)])
+            buffers.append(part)
+            # Каждый буфер выравнивается на 8 байт
+            padding = -len(part) % 8
+            if padding:
+                buffers.append(b'\0' * padding)
+            offset += len(part) + padding
+        layout.append({'kind': kind, 'nulls': null_count, 'buffers': spans})
+
+    header = json.dumps({
+        'rows': n_rows,
+        'columns': table._columns,
+        'column_types': list(table._type_vec),
+        'layout': layout,
+    }, ensure_ascii=False).encode('utf-8')
+    prefix = MAGIC + struct.pack('<I', len(header)) + header
+
+    with open(file_path, 'wb') as f:
+        f.write(prefix)
+        f.write(b'\0' * (-len(prefix) % 8))
+        for part in buffers:
+            f.write(part)
+
+
+def _decode_column(mm, base, n_rows, spec):
+    """Функция, читающая колонку из mmap при первом обращении"""
+    kind = spec['kind']
+    spans = [(base + start, base + start + length) for start, length in spec['buffers']]
+    null_count = spec['nulls']
+
+    def load():
+        if kind == 'none':
+            return [None] * n_rows
+        if kind == 'pickle':
+            start, stop = spans[0]
+            return pickle.loads(mm[start:stop])
+
+        if kind == 'category':
+            codes = array('i')
+            codes.frombytes(mm[spans[0][0]:spans[0][1]])
+            offsets = array('q')
+            offsets.frombytes(mm[spans[1][0]:spans[1][1]])
+            blob = mm[spans[2][0]:spans[2][1]]
+            categories = [blob[offsets[i]:offsets[i + 1]].decode('utf-8')
+                          for i in range(len(offsets) - 1)]
+            return CategoryColumn(categories, codes)
+
+        nulls = bytearray(mm[spans[0][0]:spans[0][1]])
+
+        def is_null(i):
+            return null_count and nulls[i >> 3] & (1 << (i & 7))
+
+        if kind in ARRAY_CODES:
+            values = array(ARRAY_CODES[kind])
+            values.frombytes(mm[spans[1][0]:spans[1][1]])
+            return TypedColumn(kind, values, nulls, null_count)
+
+        if kind == 'datetime':
+            micros = array('q')
+            micros.frombytes(mm[spans[1][0]:spans[1][1]])
+            return [None if is_null(i) else _EPOCH + v * _MICROSECOND
+                    for i, v in enumerate(micros)]
+
+        # str
+        offsets = array('q')
+        offsets.frombytes(mm[spans[1][0]:spans[1][1]])
+        blob = mm[spans[2][0]:spans[2][1]]
+        return [None if is_null(i) else blob[offsets[i]:offsets[i + 1]].decode('utf-8')
+                for i in range(n_rows)]
+
+    return LazyColumn(load)
+
+
+def open_columnar(file_path):
+    """Открывает файл через mmap: колонки читаются только при обращении к ним"""
+    with open(file_path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if mm[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"Not a columnar table file: {file_path}")
+    header_start = len(MAGIC) + 4
+    (header_len,) = struct.unpack('<I', mm[len(MAGIC):header_start])
+    header = json.loads(mm[header_start:header_start + header_len].decode('utf-8'))
+    base = header_start + header_len
+    base += -base % 8
+
+    n_rows = header['rows']
+    columns = header['columns']
+    store = ColumnStore.from_columns(
+        [_decode_column(mm, base, n_rows, spec) for spec in header['layout']], n_rows)
+
+    table = Table(None, columns, dict(zip(columns, header['column_types'])))
+    table._data = store
+    table._typed = set(columns)
+    return table
+
+
+@instrumented('load_columnar')
+def load_columnar(*files, detect_types=False):
+    """Загрузка из бинарного колоночного файла(ов)"""
+    if not files:
+        raise ValueError("No files provided")
+
+    tables = [open_columnar(file_path) for file_path in files]
+    main_table = tables[0]
+    for file_path, table in zip(files[1:], tables[1:]):
+        if table._columns != main_table._columns:
+            raise ValueError(f"Column mismatch in {file_path}")
+
+    if len(tables) > 1:
+        columns = []
+        types = []
+        for col_idx in range(len(main_table._columns)):
+            values = []
+            for table in tables:
+                values.extend(table._read_column(col_idx))
+            columns.append(values)
+            types.append(main_table._type_vec[col_idx])
+        main_table._data = ColumnStore(columns, types)
+        main_table._typed = {col for col in main_table._columns
+                             if all(t._column_types == main_table._column_types for t in tables)}
+
+    if detect_types:
+        main_table.auto_detect_column_types()
+    return main_table
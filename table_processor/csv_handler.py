@@ -1,13 +1,18 @@
 import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import partial
+from itertools import islice, repeat
 from .base_table import Table
+from .casting import detect_column_type, reconcile_types
+from .profiling import instrumented
 
-def load_csv(*files, detect_types=False, delimiter=',', encoding='utf-8'):
-    """Загрузка из CSV файла(ов)"""
-    all_data = []
+def _open_csv_files(files, delimiter, encoding):
+    """Открывает файлы по очереди, проверяет заголовки и выдает (колонки, reader)"""
     columns = None
-    
     for file_path in files:
-        with open(file_path, 'r', encoding=encoding) as f:
+        with open(file_path, 'r', encoding=encoding, newline='') as f:
             reader = csv.reader(f, delimiter=delimiter)
             try:
                 file_columns = next(reader)
@@ -19,17 +24,207 @@ def load_csv(*files, detect_types=False, delimiter=',', encoding='utf-8'):
             elif file_columns != columns:
                 raise ValueError(f"Column mismatch in {file_path}")
             
-            all_data.extend(list(reader))
+            yield columns, reader
+
+def iter_csv(*files, chunk_rows=10000, delimiter=',', encoding='utf-8'):
+    """Потоковое чтение CSV файла(ов): выдает таблицы не более чем по chunk_rows строк"""
+    if chunk_rows < 1:
+        raise ValueError(f"chunk_rows must be positive: {chunk_rows}")
+    
+    columns = None
+    chunk = []
+    for columns, reader in _open_csv_files(files, delimiter, encoding):
+        while True:
+            chunk.extend(islice(reader, chunk_rows - len(chunk)))
+            if len(chunk) < chunk_rows:
+                break
+            yield Table._from_rows(chunk, columns)
+            chunk = []
+    
+    if chunk:
+        yield Table._from_rows(chunk, columns)
+
+def _load_csv_shard(file_path, delimiter, encoding, detect_types, samples=10):
+    """Разбор одного файла в процессе-обработчике: (колонки, строки, типы)"""
+    rows = []
+    columns = None
+    for columns, reader in _open_csv_files([file_path], delimiter, encoding):
+        rows.extend(reader)
+    if columns is None:
+        return None, rows, None
+    
+    table = Table._from_rows(rows, columns)
+    types = None
+    if detect_types and rows:
+        types = [detect_column_type(table._read_column(col_idx)[:samples], default='none')[0]
+                 for col_idx in range(len(columns))]
+    return columns, table._data, types
+
+def _load_csv_parallel(files, workers, detect_types, delimiter, encoding):
+    """Параллельный разбор файлов с сохранением их порядка"""
+    all_data = []
+    columns = None
+    shard_types = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(_load_csv_shard, files, repeat(delimiter),
+                               repeat(encoding), repeat(detect_types))
+        for file_path, (file_columns, rows, types) in zip(files, results):
+            if file_columns is None:
+                continue
+            if columns is None:
+                columns = file_columns
+            elif file_columns != columns:
+                raise ValueError(f"Column mismatch in {file_path}")
+            all_data.extend(rows)
+            if types is not None:
+                shard_types.append(types)
+    
+    table = Table._from_rows(all_data, columns)
+    if detect_types:
+        # Типы частей сводятся один раз, данные приводятся один раз
+        types = reconcile_types(shard_types) or ['str'] * len(table._columns)
+        table.set_column_types(dict(enumerate(types)), workers=workers)
+    return table
+
+@instrumented('load_csv')
+def load_csv(*files, detect_types=False, delimiter=',', encoding='utf-8', chunk_rows=None,
+             workers=None):
+    """Загрузка из CSV файла(ов); workers > 1 - разбор файлов в нескольких процессах"""
+    if workers is not None and workers > 1 and len(files) > 1:
+        return _load_csv_parallel(files, workers, detect_types, delimiter, encoding)
+    
+    if chunk_rows is None:
+        all_data = []
+        columns = None
+        for columns, reader in _open_csv_files(files, delimiter, encoding):
+            all_data.extend(reader)
+        table = Table._from_rows(all_data, columns)
+    else:
+        # Таблица растет по частям, промежуточный список всех строк не строится
+        table = None
+        for chunk in iter_csv(*files, chunk_rows=chunk_rows,
+                              delimiter=delimiter, encoding=encoding):
+            if table is None:
+                table = chunk
+            else:
+                table._data.extend(chunk._data)
+        if table is None:
+            # Строк нет: колонки берутся из заголовка, как и без chunk_rows
+            columns = next((columns for columns, _ in _open_csv_files(files, delimiter, encoding)),
+                           None)
+            table = Table._from_rows([], columns)
     
-    table = Table(all_data, columns)
     if detect_types:
         table.auto_detect_column_types()
     return table
 
-def save_csv(table, file_path, delimiter=',', encoding='utf-8'):
-    """Сохранение в CSV"""
-    with open(file_path, 'w', newline='', encoding=encoding) as f:
-        writer = csv.writer(f, delimiter=delimiter)
-        writer.writerow(table._columns)
-        for row in table._data:
-            writer.writerow([cell if cell is not None else '' for cell in row])
+def _datetime_formatter(datetime_format):
+    """Функция форматирования datetime с заранее заданным форматом.
+
+    Без формата datetime записывается модулем csv в ISO виде ('YYYY-MM-DD HH:MM:SS'),
+    это быстрее любого форматирования на Python.
+    """
+    if datetime_format is None:
+        return None
+    return partial(datetime.strftime, format=datetime_format)
+
+class CsvWriter:
+    """Запись строк в CSV пачками при открытом файле.
+
+    append=True дописывает в существующий файл (заголовок должен совпадать).
+    sync(table) записывает только строки, добавленные в таблицу после
+    предыдущего sync, поэтому растущую таблицу не нужно сохранять целиком.
+    """
+
+    def __init__(self, file_path, columns=None, table=None, append=False, delimiter=',',
+                 encoding='utf-8', datetime_format=None, batch_rows=10000):
+        if table is not None and columns is None:
+            columns = table._columns
+        if not columns:
+            raise ValueError("No columns provided")
+        self.file_path = file_path
+        self.columns = list(columns)
+        self.batch_rows = batch_rows
+        self.rows_written = 0
+        self._synced = 0
+        self._format = _datetime_formatter(datetime_format)
+        self._formatters = []
+        if table is not None:
+            self._formatters = self._table_formatters(table)
+
+        write_header = True
+        if append and os.path.exists(file_path) and os.path.getsize(file_path) > 0:
+            with open(file_path, 'r', encoding=encoding, newline='') as f:
+                header = next(csv.reader(f, delimiter=delimiter), None)
+            if header != self.columns:
+                raise ValueError(f"Column mismatch in {file_path}")
+            write_header = False
+        self._file = open(file_path, 'a' if append else 'w', newline='', encoding=encoding)
+        self._writer = csv.writer(self._file, delimiter=delimiter)
+        if write_header:
+            self._writer.writerow(self.columns)
+
+    def _table_formatters(self, table):
+        """(номер колонки, форматер) для колонок, хранящих объекты datetime"""
+        if table._columns != self.columns:
+            raise ValueError(f"Column mismatch in {self.file_path}")
+        fmt = self._format
+        if fmt is None:
+            return []
+        return [(i, fmt) for i, col in enumerate(table._columns)
+                if table._type_vec[i] == 'datetime' and col in table._typed]
+
+    def write_rows(self, rows):
+        """Записывает строки пачками (None записывается как пустая строка)"""
+        formatters = self._formatters
+        iterator = iter(rows)
+        while True:
+            batch = list(islice(iterator, self.batch_rows))
+            if not batch:
+                break
+            if formatters:
+                batch = [list(row) for row in batch]
+                for i, fmt in formatters:
+                    for row in batch:
+                        value = row[i]
+                        if value is not None:
+                            row[i] = fmt(value)
+            self._writer.writerows(batch)
+            self.rows_written += len(batch)
+
+    def write_table(self, table):
+        """Записывает все строки таблицы"""
+        self._formatters = self._table_formatters(table)
+        self.write_rows(table._data)
+        self._synced = len(table._data)
+
+    def sync(self, table):
+        """Дописывает строки таблицы, добавленные после предыдущего sync/write_table"""
+        self._formatters = self._table_formatters(table)
+        data = table._data
+        total = len(data)
+        for start in range(self._synced, total, self.batch_rows):
+            self.write_rows(data[start:min(start + self.batch_rows, total)])
+        self._synced = total
+        self._file.flush()
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+@instrumented('save_csv')
+def save_csv(table, file_path, delimiter=',', encoding='utf-8', append=False,
+             datetime_format=None):
+    """Сохранение в CSV (append=True - дописать строки в существующий файл)"""
+    with CsvWriter(file_path, table=table, append=append, delimiter=delimiter,
+                   encoding=encoding, datetime_format=datetime_format) as writer:
+        writer.write_table(table)
@@ -0,0 +1,199 @@
+from concurrent.futures import ProcessPoolExecutor
+from .base_table import Table, TableError
+
+FUNCS = ('count', 'sum', 'mean', 'min', 'max')
+NUMERIC_TYPES = ('int', 'float', 'bool')
+
+
+def _group_codes(key_columns):
+    """Номер группы для каждой строки и ключи групп в порядке первого появления"""
+    groups = {}
+    if len(key_columns) == 1:
+        keys = ((value,) for value in key_columns[0])
+    else:
+        keys = zip(*key_columns)
+    codes = [groups.setdefault(key, len(groups)) for key in keys]
+    return codes, list(groups)
+
+
+def _accumulate(op, codes, values, n_groups):
+    """Один проход по колонке: состояние операции для каждой группы (None пропускаются)"""
+    if op == 'rows':
+        out = [0] * n_groups
+        for g in codes:
+            out[g] += 1
+        return out
+    if op == 'count':
+        out = [0] * n_groups
+        for g, v in zip(codes, values):
+            if v is not None:
+                out[g] += 1
+        return out
+
+    out = [None] * n_groups
+    if op == 'sum':
+        # Сумма начинается с 0: сумма bool-колонки - int, как и заявленный тип результата
+        for g, v in zip(codes, values):
+            if v is not None:
+                acc = out[g]
+                out[g] = (0 if acc is None else acc) + v
+    elif op == 'min':
+        for g, v in zip(codes, values):
+            if v is not None:
+                acc = out[g]
+                if acc is None or v < acc:
+                    out[g] = v
+    else:
+        for g, v in zip(codes, values):
+            if v is not None:
+                acc = out[g]
+                if acc is None or v > acc:
+                    out[g] = v
+    return out
+
+
+def _merge_state(op, a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if op in ('rows', 'count', 'sum'):
+        return a + b
+    if op == 'min':
+        return b if b < a else a
+    return b if b > a else a
+
+
+def _partial_aggregate(key_columns, value_columns, ops):
+    """Частичные агрегаты одного блока строк: (ключи, состояния по операциям)"""
+    codes, keys = _group_codes(key_columns)
+    states = [_accumulate(op, codes, values, len(keys))
+              for op, values in zip(ops, value_columns)]
+    return keys, states
+
+
+class GroupBy:
+    """Группировка таблицы по колонкам; агрегаты вычисляются в agg()"""
+
+    def __init__(self, table, columns):
+        if not columns:
+            raise TableError("No columns provided")
+        self._table = table
+        self._keys = [table._resolve_column(col) for col in columns]
+
+    def _parse_specs(self, specs, named):
+        """Список (имя колонки результата, номер колонки или None, функция)"""
+        table = self._table
+        parsed = []
+        items = [(None, spec) for spec in specs] + list(named.items())
+        for name, spec in items:
+            if isinstance(spec, str):
+                column, func = None, spec
+            else:
+                column, func = spec
+            if func not in FUNCS:
+                raise TableError(f"Unknown aggregate: {func}")
+            if column is None or column == '*':
+                if func != 'count':
+                    raise TableError(f"Aggregate {func} requires a column")
+                col_idx = None
+            else:
+                col_idx = table._resolve_column(column)
+                if func in ('sum', 'mean') and table._type_vec[col_idx] not in NUMERIC_TYPES:
+                    raise TableError(f"Aggregate {func} requires a numeric column, "
+                                     f"got {table._type_vec[col_idx]}")
+            if name is None:
+                name = func if col_idx is None else f"{func}_{table._columns[col_idx]}"
+            parsed.append((name, col_idx, func))
+        return parsed
+
+    def _result_type(self, col_idx, func):
+        if func == 'count':
+            return 'int'
+        col_type = self._table._type_vec[col_idx]
+        if func == 'mean':
+            return 'float'
+        if func == 'sum':
+            return 'int' if col_type in ('int', 'bool') else 'float'
+        return col_type
+
+    def agg(self, *specs, workers=None, **named):
+        """Агрегаты по группам: agg('count', ('Price', 'sum'), avg=('Price', 'mean')).
+
+        Функции: count, sum, mean, min, max; ячейки None не учитываются.
+        workers > 1 - частичные агрегаты блоков строк считаются в нескольких процессах.
+        """
+        table = self._table
+        parsed = self._parse_specs(specs, named)
+        if not parsed:
+            raise TableError("No aggregates provided")
+        names = [table._columns[k] for k in self._keys] + [name for name, _, _ in parsed]
+        if len(set(names)) != len(names):
+            raise TableError(f"Duplicate result columns: {names}")
+
+        # mean считается как sum и count; каждая колонка читается и приводится один раз
+        ops = []
+        sources = []
+        for _, col_idx, func in parsed:
+            parts = ('sum', 'count') if func == 'mean' else (func,)
+            for op in parts:
+                ops.append('rows' if col_idx is None else op)
+                sources.append(col_idx)
+        cache = {}
+        for col_idx in set(self._keys) | {c for c in sources if c is not None}:
+            cache[col_idx] = table.get_values(col_idx)
+        key_columns = [cache[k] for k in self._keys]
+        value_columns = [None if c is None else cache[c] for c in sources]
+
+        n_rows = len(table._data)
+        if workers is not None and workers > 1 and n_rows > 1:
+            keys, states = self._aggregate_parallel(key_columns, value_columns, ops, workers)
+        else:
+            keys, states = _partial_aggregate(key_columns, value_columns, ops)
+
+        results = []
+        i = 0
+        for _, col_idx, func in parsed:
+            if func == 'mean':
+                sums, counts = states[i], states[i + 1]
+                results.append([s / c if c else None for s, c in zip(sums, counts)])
+                i += 2
+            else:
+                results.append(states[i])
+                i += 1
+
+        rows = [list(key) for key in keys]
+        for row, values in zip(rows, zip(*results)):
+            row.extend(values)
+        types = {table._columns[k]: table._type_vec[k] for k in self._keys}
+        for name, col_idx, func in parsed:
+            types[name] = self._result_type(col_idx, func)
+        result = Table._from_rows(rows, names, types)
+        result._typed = set(names)
+        return result
+
+    def _aggregate_parallel(self, key_columns, value_columns, ops, workers):
+        """Частичные агрегаты по блокам строк в процессах и их слияние по порядку блоков"""
+        n_rows = len(key_columns[0])
+        block = -(-n_rows // workers)
+        bounds = [(start, start + block) for start in range(0, n_rows, block)]
+        keys = {}
+        states = [[] for _ in ops]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            partials = executor.map(
+                _partial_aggregate,
+                [[column[a:b] for column in key_columns] for a, b in bounds],
+                [[None if column is None else column[a:b] for column in value_columns]
+                 for a, b in bounds],
+                [ops] * len(bounds))
+            for part_keys, part_states in partials:
+                for j, key in enumerate(part_keys):
+                    g = keys.get(key)
+                    if g is None:
+                        keys[key] = len(keys)
+                        for state, part in zip(states, part_states):
+                            state.append(part[j])
+                    else:
+                        for op, state, part in zip(ops, states, part_states):
+                            state[g] = _merge_state(op, state[g], part[j])
+        return list(keys), states
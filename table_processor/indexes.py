@@ -0,0 +1,149 @@
+import sys
+from bisect import bisect_left, bisect_right
+
+
+class KeyIndex:
+    """Хеш-индекс по колонке: нормализованный ключ -> позиции строк"""
+
+    def __init__(self, values):
+        self._buckets = {}
+        for pos, value in enumerate(values):
+            if value is not None:
+                self._buckets.setdefault(str(value), []).append(pos)
+
+    @classmethod
+    def from_codes(cls, codes, categories):
+        """Индекс по кодам категориальной колонки (без чтения строк)"""
+        index = cls(())
+        positions = [[] for _ in categories]
+        for pos, code in enumerate(codes):
+            if code >= 0:
+                positions[code].append(pos)
+        for value, bucket in zip(categories, positions):
+            if bucket:
+                index._buckets[index.normalize(value)] = bucket
+        return index
+
+    @staticmethod
+    def normalize(value):
+        """Ключ, по которому сравниваются значения (как в get_rows_by_index)"""
+        return str(value)
+
+    def lookup(self, *values):
+        """Позиции строк (по возрастанию), первая колонка которых совпадает с values"""
+        keys = {self.normalize(v) for v in values}
+        buckets = [self._buckets[k] for k in keys if k in self._buckets]
+        if len(buckets) == 1:
+            return list(buckets[0])
+        positions = []
+        for bucket in buckets:
+            positions.extend(bucket)
+        positions.sort()
+        return positions
+
+    def update(self, pos, old_value, new_value):
+        """Переносит строку pos из корзины old_value в корзину new_value"""
+        old_key = None if old_value is None else self.normalize(old_value)
+        new_key = None if new_value is None else self.normalize(new_value)
+        if old_key == new_key:
+            return
+        if old_key is not None:
+            bucket = self._buckets.get(old_key)
+            if bucket is not None:
+                # Корзины отсортированы: позиция ищется бинарным поиском
+                i = bisect_left(bucket, pos)
+                if i < len(bucket) and bucket[i] == pos:
+                    del bucket[i]
+                if not bucket:
+                    del self._buckets[old_key]
+        if new_key is not None:
+            bucket = self._buckets.setdefault(new_key, [])
+            if not bucket or bucket[-1] < pos:
+                bucket.append(pos)
+            else:
+                bucket.insert(bisect_left(bucket, pos), pos)
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class SortedIndex:
+    """Отсортированная перестановка строк по значению колонки.
+
+    Значения и позиции хранятся в двух параллельных списках, упорядоченных
+    по (значение, позиция); ячейки None хранятся отдельно и считаются
+    большими любого значения (идут в конце порядка индекса).
+    """
+
+    kind = 'sorted'
+
+    def __init__(self, values):
+        order = sorted((i for i, v in enumerate(values) if v is not None),
+                       key=values.__getitem__)
+        self._values = [values[i] for i in order]
+        self._positions = order
+        self._nulls = [i for i, v in enumerate(values) if v is None]
+
+    def __len__(self):
+        return len(self._positions) + len(self._nulls)
+
+    def _bounds(self, low, high, include_low, include_high):
+        values = self._values
+        if low is None:
+            lo = 0
+        else:
+            lo = (bisect_left if include_low else bisect_right)(values, low)
+        if high is None:
+            hi = len(values)
+        else:
+            hi = (bisect_right if include_high else bisect_left)(values, high)
+        return lo, max(lo, hi)
+
+    def range(self, low=None, high=None, include_low=True, include_high=True, ordered=False):
+        """Позиции строк со значением между low и high (None - без границы).
+
+        По умолчанию позиции по возрастанию, ordered=True - в порядке значений.
+        """
+        lo, hi = self._bounds(low, high, include_low, include_high)
+        positions = self._positions[lo:hi]
+        return positions if ordered else sorted(positions)
+
+    def prefix(self, prefix, ordered=False):
+        """Позиции строк, строковое значение которых начинается с prefix"""
+        if not prefix:
+            return self.range(ordered=ordered)
+        # Верхняя граница - префикс с увеличенным последним символом;
+        # символы U+10FFFF в конце не увеличиваются и отбрасываются
+        stem = prefix.rstrip(chr(sys.maxunicode))
+        if not stem:
+            return self.range(prefix, ordered=ordered)
+        upper = stem[:-1] + chr(ord(stem[-1]) + 1)
+        return self.range(prefix, upper, include_high=False, ordered=ordered)
+
+    def ordered_positions(self):
+        """Все позиции в порядке значений (None - в конце)"""
+        return self._positions + self._nulls
+
+    def _find(self, pos, value):
+        lo = bisect_left(self._values, value)
+        hi = bisect_right(self._values, value, lo)
+        return bisect_left(self._positions, pos, lo, hi)
+
+    def update(self, pos, old_value, new_value):
+        """Переносит строку pos со значения old_value на new_value"""
+        if old_value is None:
+            i = bisect_left(self._nulls, pos)
+            if i < len(self._nulls) and self._nulls[i] == pos:
+                del self._nulls[i]
+        else:
+            i = self._find(pos, old_value)
+            if i < len(self._positions) and self._positions[i] == pos:
+                del self._values[i]
+                del self._positions[i]
+        if new_value is None:
+            i = bisect_left(self._nulls, pos)
+            self._nulls.insert(i, pos)
+        else:
+            i = self._find(pos, new_value)
+            self._values.insert(i, new_value)
+            self._positions.insert(i, pos)
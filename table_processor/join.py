@@ -0,0 +1,103 @@
+from .base_table import Table, TableError
+from .query import BLOCK_ROWS, column_cells
+
+HOW = ('inner', 'left')
+
+
+def _as_list(columns):
+    return list(columns) if isinstance(columns, (list, tuple)) else [columns]
+
+
+def _key_of(key_columns, i):
+    if len(key_columns) == 1:
+        return key_columns[0][i]
+    return tuple(column[i] for column in key_columns)
+
+
+def _result_names(left_names, right_names, suffix):
+    """Имена колонок результата: совпадающие имена правой таблицы получают суффикс"""
+    names = list(left_names)
+    taken = set(names)
+    for name in right_names:
+        new_name = name
+        n = 1
+        while new_name in taken:
+            new_name = f"{name}{suffix}" if n == 1 else f"{name}{suffix}{n}"
+            n += 1
+        taken.add(new_name)
+        names.append(new_name)
+    return names
+
+
+def join(left, right, on, how='inner', right_on=None, suffix='_right'):
+    """Хеш-соединение двух таблиц по ключевым колонкам.
+
+    Хеш-таблица строится по меньшей таблице (при how='left' - всегда по правой),
+    другая таблица читается блоками. Ключи с None не совпадают ни с чем.
+    Порядок строк результата - порядок читаемой блоками таблицы.
+    """
+    if how not in HOW:
+        raise TableError(f"Unknown join type: {how}")
+    left_keys = [left._resolve_column(col) for col in _as_list(on)]
+    right_keys = [right._resolve_column(col) for col in _as_list(on if right_on is None else right_on)]
+    if not left_keys or len(left_keys) != len(right_keys):
+        raise TableError("Join keys must have the same length")
+
+    # Одноименная ключевая колонка правой таблицы не повторяется в результате
+    shared = {r for l, r in zip(left_keys, right_keys) if left._columns[l] == right._columns[r]}
+    left_out = list(range(len(left._columns)))
+    right_out = [i for i in range(len(right._columns)) if i not in shared]
+    names = _result_names(left._columns, [right._columns[i] for i in right_out], suffix)
+    types = dict(zip(names, [left._type_vec[i] for i in left_out] +
+                     [right._type_vec[i] for i in right_out]))
+
+    build_right = how == 'left' or len(right._data) <= len(left._data)
+    if build_right:
+        build, build_keys, build_out = right, right_keys, right_out
+        probe, probe_keys, probe_out = left, left_keys, left_out
+    else:
+        build, build_keys, build_out = left, left_keys, left_out
+        probe, probe_keys, probe_out = right, right_keys, right_out
+
+    # Хеш-таблица: ключ -> номера строк меньшей таблицы
+    key_columns = [build.get_values(col_idx) for col_idx in build_keys]
+    hashed = {}
+    for i in range(len(build._data)):
+        key = _key_of(key_columns, i)
+        if key is None or (isinstance(key, tuple) and None in key):
+            continue
+        hashed.setdefault(key, []).append(i)
+    del key_columns
+    build_columns = [build.get_values(col_idx) for col_idx in build_out]
+    build_rows = {}
+
+    def build_row(i):
+        row = build_rows.get(i)
+        if row is None:
+            row = build_rows[i] = [column[i] for column in build_columns]
+        return row
+
+    missing = [None] * len(build_out)
+    rows = []
+    n_rows = len(probe._data)
+    for start in range(0, n_rows, BLOCK_ROWS):
+        block = range(start, min(start + BLOCK_ROWS, n_rows))
+        keys = [column_cells(probe, col_idx, block) for col_idx in probe_keys]
+        cells = [column_cells(probe, col_idx, block) for col_idx in probe_out]
+        for j in range(len(block)):
+            key = _key_of(keys, j)
+            matches = hashed.get(key)
+            if matches is None:
+                if how == 'left':
+                    rows.append([column[j] for column in cells] + missing)
+                continue
+            probe_row = [column[j] for column in cells]
+            for i in matches:
+                if build_right:
+                    rows.append(probe_row + build_row(i))
+                else:
+                    rows.append(build_row(i) + probe_row)
+
+    result = Table._from_rows(rows, names, types)
+    result._typed = set(names)
+    return result
@@ -0,0 +1,234 @@
+import csv
+import io
+import mmap
+import os
+import struct
+from array import array
+from collections import OrderedDict
+from itertools import islice
+from .base_table import Table
+
+# Сколько разобранных строк держит LRU ленивой таблицы
+LAZY_CACHE_ROWS = 10000
+# Строк, разбираемых за раз при последовательном чтении
+PARSE_BLOCK_ROWS = 1000
+
+# Файл индекса: MAGIC | размер файла, mtime_ns, число смещений (int64 LE) | смещения
+INDEX_MAGIC = b'TPIDX\x01'
+_INDEX_HEADER = struct.Struct('<qqq')
+
+
+def _scan_offsets(mm):
+    """Смещения начала каждой строки CSV и конца файла (перевод строки в кавычках не считается)"""
+    offsets = array('q')
+    append = offsets.append
+    find = mm.find
+    size = len(mm)
+    pos = 0
+    if find(b'"') == -1:
+        while pos < size:
+            append(pos)
+            newline = find(b'\n', pos)
+            pos = size if newline == -1 else newline + 1
+    else:
+        # Строка заканчивается на переводе строки при четном числе кавычек с ее начала
+        row_start = 0
+        quotes = 0
+        while pos < size:
+            newline = find(b'\n', pos)
+            end = size if newline == -1 else newline + 1
+            quotes += mm[pos:end].count(b'"')
+            pos = end
+            if not quotes & 1:
+                append(row_start)
+                row_start = pos
+                quotes = 0
+        if row_start < size:
+            append(row_start)
+    append(size)
+    return offsets
+
+
+def _index_path(file_path):
+    return file_path + '.idx'
+
+
+def _load_index(file_path):
+    """Смещения из файла индекса, если он построен для текущей версии CSV"""
+    try:
+        with open(_index_path(file_path), 'rb') as f:
+            if f.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                return None
+            size, mtime_ns, count = _INDEX_HEADER.unpack(f.read(_INDEX_HEADER.size))
+            stat = os.stat(file_path)
+            if size != stat.st_size or mtime_ns != stat.st_mtime_ns:
+                return None
+            offsets = array('q')
+            offsets.frombytes(f.read(count * offsets.itemsize))
+            return offsets if len(offsets) == count else None
+    except (OSError, struct.error):
+        return None
+
+
+def _save_index(file_path, offsets):
+    stat = os.stat(file_path)
+    with open(_index_path(file_path), 'wb') as f:
+        f.write(INDEX_MAGIC)
+        f.write(_INDEX_HEADER.pack(stat.st_size, stat.st_mtime_ns, len(offsets)))
+        f.write(offsets.tobytes())
+
+
+class LazyCsvRows:
+    """Строки CSV над mmap: строка разбирается только при обращении к ней.
+
+    Разобранные строки хранятся в LRU на cache_rows строк. Приведение типов
+    задается функциями приведения колонок и выполняется при разборе.
+    Первая запись (set_cell, write_column, extend) разбирает файл целиком
+    и дальше хранилище работает как обычный список строк.
+    """
+
+    def __init__(self, mm, offsets, width, delimiter=',', encoding='utf-8',
+                 cache_rows=LAZY_CACHE_ROWS):
+        self._mm = mm
+        self._offsets = offsets
+        self._width = width
+        self._delimiter = delimiter
+        self._encoding = encoding
+        self._cache_rows = cache_rows
+        self._cache = OrderedDict()
+        self._casters = {}
+        self._rows = None
+
+    @property
+    def is_lazy(self):
+        return self._rows is None
+
+    def set_caster(self, col_idx, caster):
+        """Приводить колонку при разборе; False, если строки уже разобраны целиком"""
+        if self._rows is not None:
+            return False
+        self._casters[col_idx] = caster
+        self._cache.clear()
+        return True
+
+    def _finish(self, row):
+        """Выравнивает строку по числу колонок и приводит типизированные колонки"""
+        width = self._width
+        n = len(row)
+        if n < width:
+            row.extend([None] * (width - n))
+        elif n > width:
+            del row[width:]
+        for col_idx, caster in self._casters.items():
+            row[col_idx] = caster(row[col_idx])
+        return row
+
+    def _parse(self, i):
+        offsets = self._offsets
+        text = self._mm[offsets[i]:offsets[i + 1]].decode(self._encoding)
+        return self._finish(next(csv.reader([text], delimiter=self._delimiter), []))
+
+    def _row(self, i):
+        cache = self._cache
+        row = cache.get(i)
+        if row is not None:
+            cache.move_to_end(i)
+            return row
+        row = cache[i] = self._parse(i)
+        if len(cache) > self._cache_rows:
+            cache.popitem(last=False)
+        return row
+
+    def _iter_range(self, start, stop):
+        """Последовательный разбор строк start..stop блоками"""
+        offsets = self._offsets
+        for block_start in range(start, stop, PARSE_BLOCK_ROWS):
+            block_stop = min(block_start + PARSE_BLOCK_ROWS, stop)
+            text = self._mm[offsets[block_start]:offsets[block_stop]].decode(self._encoding)
+            reader = csv.reader(io.StringIO(text, newline=''), delimiter=self._delimiter)
+            rows = list(islice(reader, block_stop - block_start))
+            width = self._width
+            if self._casters or any(len(row) != width for row in rows):
+                rows = [self._finish(row) for row in rows]
+            yield from rows
+
+    def materialize(self):
+        """Разбирает все строки; дальше данные хранятся в списке"""
+        if self._rows is None:
+            self._rows = list(self._iter_range(0, len(self)))
+            self._cache.clear()
+        return self._rows
+
+    def __reduce__(self):
+        # mmap не сериализуется: в pickle попадает обычный список разобранных строк
+        return list, (list(self),)
+
+    # === Протокол хранилища ===
+
+    def read_column(self, col_idx):
+        return [row[col_idx] for row in self]
+
+    def write_column(self, col_idx, values, col_type=None):
+        for row, value in zip(self.materialize(), values):
+            row[col_idx] = value
+
+    def get_cell(self, row_idx, col_idx):
+        return self[row_idx][col_idx]
+
+    def set_cell(self, row_idx, col_idx, value):
+        self.materialize()[row_idx][col_idx] = value
+
+    def extend(self, rows):
+        self.materialize().extend(rows)
+
+    # === Последовательность строк ===
+
+    def __len__(self):
+        if self._rows is not None:
+            return len(self._rows)
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if self._rows is not None:
+            return self._rows[i]
+        n = len(self)
+        if isinstance(i, slice):
+            start, stop, step = i.indices(n)
+            if step == 1:
+                return list(self._iter_range(start, stop)) if start < stop else []
+            return [self._row(j) for j in range(start, stop, step)]
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("row index out of range")
+        return self._row(i)
+
+    def __iter__(self):
+        if self._rows is not None:
+            return iter(self._rows)
+        return self._iter_range(0, len(self))
+
+
+def open_csv(file_path, delimiter=',', encoding='utf-8', cache_rows=LAZY_CACHE_ROWS,
+             persist_index=False):
+    """Открывает CSV лениво: mmap и индекс смещений строк без разбора данных.
+
+    persist_index=True сохраняет индекс рядом с файлом (file_path + '.idx')
+    и использует его при следующем открытии, если файл не менялся.
+    """
+    if os.path.getsize(file_path) == 0:
+        return Table()
+    with open(file_path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    offsets = _load_index(file_path) if persist_index else None
+    if offsets is None:
+        offsets = _scan_offsets(mm)
+        if persist_index:
+            _save_index(file_path, offsets)
+
+    header = mm[offsets[0]:offsets[1]].decode(encoding)
+    columns = next(csv.reader([header], delimiter=delimiter), [])
+    table = Table(None, columns)
+    table._data = LazyCsvRows(mm, offsets[1:], len(columns), delimiter, encoding, cache_rows)
+    return table
@@ -1,40 +1,79 @@
 import pickle
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from .base_table import Table
+from .column_store import ColumnStore
+from .casting import detect_column_type, reconcile_types
+from .segments import merge_tables
+from .profiling import instrumented
 
-def load_pickle(*files, detect_types=False):
-    """Загрузка из Pickle файла(ов)"""
-    tables = []
-    for file_path in files:
-        with open(file_path, 'rb') as f:
-            data = pickle.load(f)
-            if isinstance(data, Table):
-                tables.append(data)
-            elif isinstance(data, dict):
-                tables.append(Table(data.get('data', []), 
-                                  data.get('columns', []), 
-                                  data.get('column_types', {})))
+def _read_pickle_file(file_path, detect_types=False, samples=10):
+    """Читает один pickle файл: (таблица или None, типы, определенные по файлу)"""
+    with open(file_path, 'rb') as f:
+        data = pickle.load(f)
+    if isinstance(data, Table):
+        table = data
+    elif isinstance(data, dict):
+        rows = data.get('data', [])
+        if isinstance(rows, ColumnStore):
+            # Колоночное хранилище (коды категорий, буферы array) используется как есть
+            table = Table(None, data.get('columns', []), data.get('column_types', {}))
+            table._data = rows
+        else:
+            table = Table(rows, 
+                          data.get('columns', []), 
+                          data.get('column_types', {}))
+        table._typed = set(data.get('typed_columns', ())) & set(table._columns)
+        # Сортированные индексы восстанавливаются только для приведенных колонок
+        table._indexes = {col: index for col, index in data.get('indexes', {}).items()
+                          if col in table._typed}
+    else:
+        return None, None
     
-    if not tables:
+    types = None
+    if detect_types and table._data:
+        types = [detect_column_type(table._read_column(col_idx)[:samples], default='none')[0]
+                 for col_idx in range(len(table._columns))]
+    return table, types
+
+@instrumented('load_pickle')
+def load_pickle(*files, detect_types=False, workers=None):
+    """Загрузка из Pickle файла(ов); workers > 1 - чтение файлов в нескольких процессах.
+    
+    Несколько файлов дают таблицу из сегментов; Table.compact() склеивает их.
+    """
+    parallel = workers is not None and workers > 1 and len(files) > 1
+    if parallel:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_read_pickle_file, files, repeat(detect_types)))
+    else:
+        results = [_read_pickle_file(file_path) for file_path in files]
+    
+    tables = [table for table, _ in results]
+    if all(table is None for table in tables):
         raise ValueError("No valid data loaded")
     
-    # Объединяем таблицы
-    main_table = tables[0]
-    for table in tables[1:]:
-        if (main_table._columns != table._columns or 
-            len(main_table._columns) != len(table._columns)):
-            raise ValueError("Table structure mismatch")
-        main_table._data.extend(table._data)
+    # Объединяем таблицы: части становятся сегментами новой таблицы без копирования строк
+    main_table = merge_tables(tables, files)
     
     if detect_types:
-        main_table.auto_detect_column_types()
+        if parallel:
+            # Типы определены по каждому файлу, сводим их один раз
+            types = reconcile_types([types for _, types in results if types is not None])
+            main_table.set_column_types(dict(enumerate(types)), workers=workers)
+        else:
+            main_table.auto_detect_column_types()
     return main_table
 
+@instrumented('save_pickle')
 def save_pickle(table, file_path):
     """Сохранение в Pickle"""
     data = {
-        'data': table._data,
+        'data': table._data if table._parent is None else list(table._data),
         'columns': table._columns,
-        'column_types': table._column_types
+        'column_types': table._column_types,
+        'typed_columns': sorted(table._typed),
+        'indexes': table._indexes if table._parent is None else {}
     }
     with open(file_path, 'wb') as f:
         pickle.dump(data, f)
@@ -0,0 +1,154 @@
+"""
+Инструментирование операций таблиц.
+
+По умолчанию выключено: обернутая операция проверяет один флаг модуля.
+Включение - контекстным менеджером profile() или глобальным хуком:
+
+    with profile(memory=True) as prof:
+        table = load_table('data.csv', detect_types=True)
+    prof.summary()  # {'load_csv': {'calls': 1, 'seconds': ..., 'rows': ..., ...}, ...}
+
+    add_hook(lambda event: metrics.send(event))
+"""
+
+import functools
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# Включено, если есть активный profile() или зарегистрированный хук
+_active = False
+_collectors = []
+_hooks = []
+# Глубина вложенности операций - своя в каждом потоке (aload_table/asave_table
+# выполняют операции одновременно в потоках executor)
+_state = threading.local()
+
+
+def _update_active():
+    global _active
+    _active = bool(_collectors or _hooks)
+
+
+def add_hook(callback):
+    """Регистрирует функцию, получающую событие (dict) каждой операции"""
+    _hooks.append(callback)
+    _update_active()
+
+
+def remove_hook(callback):
+    if callback in _hooks:
+        _hooks.remove(callback)
+    _update_active()
+
+
+def _table_size(obj):
+    """(строки, ячейки) таблицы или списка значений; None, если размер неизвестен"""
+    data = getattr(obj, '_data', None)
+    columns = getattr(obj, '_columns', None)
+    if data is not None and columns is not None:
+        return len(data), len(data) * len(columns)
+    if isinstance(obj, list):
+        return len(obj), len(obj)
+    return None
+
+
+def _emit(event):
+    for collector in _collectors:
+        collector.add(event)
+    for hook in list(_hooks):
+        hook(event)
+
+
+def _run(name, func, args, kwargs):
+    depth = getattr(_state, 'depth', 0)
+    tracing = any(c.memory for c in _collectors) and tracemalloc.is_tracing()
+    outermost = depth == 0
+    if tracing:
+        before = tracemalloc.get_traced_memory()[0]
+        if outermost:
+            tracemalloc.reset_peak()
+    _state.depth = depth + 1
+    start = time.perf_counter()
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        elapsed = time.perf_counter() - start
+        _state.depth = depth
+
+    event = {'op': name, 'seconds': elapsed, 'depth': depth}
+    # Размер берется по результату, а для методов без результата - по самой таблице
+    size = _table_size(result)
+    if size is None and args:
+        size = _table_size(args[0])
+    if size is not None:
+        event['rows'], event['cells'] = size
+    if tracing:
+        current, peak = tracemalloc.get_traced_memory()
+        event['alloc_bytes'] = current - before
+        if outermost:
+            event['peak_bytes'] = peak - before
+    _emit(event)
+    return result
+
+
+def instrumented(name):
+    """Декоратор публичной операции: при выключенном профилировании - один if"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _active:
+                return func(*args, **kwargs)
+            return _run(name, func, args, kwargs)
+        return wrapper
+    return decorator
+
+
+class Profile:
+    """Сводка событий операций, собранных внутри profile()"""
+
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.events = []
+
+    def add(self, event):
+        self.events.append(event)
+
+    def summary(self):
+        """{операция: calls, seconds, max_seconds, rows, cells[, alloc_bytes, peak_bytes]}"""
+        result = {}
+        for event in self.events:
+            stats = result.setdefault(event['op'], {'calls': 0, 'seconds': 0.0, 'max_seconds': 0.0,
+                                                    'rows': 0, 'cells': 0})
+            stats['calls'] += 1
+            stats['seconds'] += event['seconds']
+            stats['max_seconds'] = max(stats['max_seconds'], event['seconds'])
+            stats['rows'] += event.get('rows', 0)
+            stats['cells'] += event.get('cells', 0)
+            if 'alloc_bytes' in event:
+                stats['alloc_bytes'] = stats.get('alloc_bytes', 0) + event['alloc_bytes']
+            if 'peak_bytes' in event:
+                stats['peak_bytes'] = max(stats.get('peak_bytes', 0), event['peak_bytes'])
+        return result
+
+
+@contextmanager
+def profile(memory=False):
+    """Собирает события операций внутри блока with в объект Profile.
+
+    memory=True включает tracemalloc (заметно замедляет выполнение).
+    """
+    prof = Profile(memory)
+    started_tracing = memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    _collectors.append(prof)
+    _update_active()
+    try:
+        yield prof
+    finally:
+        _collectors.remove(prof)
+        _update_active()
+        if started_tracing:
+            tracemalloc.stop()
@@ -0,0 +1,238 @@
+import operator
+from .base_table import Table, TableError
+from .casting import make_caster
+
+# Размер блока строк при вычислении условий по колонкам
+BLOCK_ROWS = 4096
+
+# Аргументы SortedIndex.range для операций сравнения
+RANGE_OPS = {
+    '==': lambda v: {'low': v, 'high': v},
+    '<': lambda v: {'high': v, 'include_high': False},
+    '<=': lambda v: {'high': v},
+    '>': lambda v: {'low': v, 'include_low': False},
+    '>=': lambda v: {'low': v},
+}
+
+
+def _in(value, values):
+    return value in values
+
+
+def _not_in(value, values):
+    return value not in values
+
+
+OPERATORS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    'in': _in,
+    'not in': _not_in,
+}
+
+
+def _read_cells(data, col_idx, positions):
+    """Хранимые значения колонки для указанных строк"""
+    if isinstance(positions, range) and isinstance(data, list) and positions.step == 1:
+        return [row[col_idx] for row in data[positions.start:positions.stop]]
+    getter = getattr(data, 'get_cell', None)
+    if getter is not None:
+        return [getter(p, col_idx) for p in positions]
+    return [data[p][col_idx] for p in positions]
+
+
+def column_cells(table, col_idx, positions):
+    """Приведенные к типу колонки значения для указанных строк таблицы"""
+    values = _read_cells(table._data, col_idx, positions)
+    if table._columns[col_idx] in table._typed:
+        return values
+    caster = make_caster(table._type_vec[col_idx])
+    return [caster(v) for v in values]
+
+
+class _Filter:
+    """Условие where: колонка, оператор и приведенное к типу колонки значение"""
+
+    def __init__(self, table, column, op, value):
+        if op not in OPERATORS:
+            raise TableError(f"Unknown operator: {op}")
+        self.col_idx = table._resolve_column(column)
+        self.op = op
+        caster = make_caster(table._type_vec[self.col_idx])
+        if op in ('in', 'not in'):
+            self.value = {self._cast(table, caster, v) for v in value}
+        else:
+            self.value = self._cast(table, caster, value)
+
+    def _cast(self, table, caster, value):
+        # Неприводимое значение - ошибка, а не условие на None
+        cast = None if value is None else caster(value)
+        if cast is None and value is not None and value != '':
+            raise TableError(f"Value {value!r} can't be compared with column "
+                             f"{table._columns[self.col_idx]} of type {table._type_vec[self.col_idx]}")
+        return cast
+
+    def matches(self, cell):
+        if cell is None or self.value is None:
+            # None равен только None и не упорядочивается
+            if self.op in ('in', 'not in'):
+                return OPERATORS[self.op](cell, self.value)
+            if self.op == '==':
+                return cell is self.value
+            if self.op == '!=':
+                return cell is not self.value
+            return False
+        try:
+            return OPERATORS[self.op](cell, self.value)
+        except TypeError:
+            return False
+
+    def matching_codes(self, category):
+        """Коды категорий (-1 - None), проходящих условие: оно проверяется по словарю"""
+        codes = {code for code, value in enumerate(category.categories) if self.matches(value)}
+        if self.matches(None):
+            codes.add(-1)
+        return codes
+
+
+class Query:
+    """Ленивый план запроса к таблице: where, select, sort_by, limit.
+
+    Методы возвращают новый план; вычисление выполняется в execute().
+    """
+
+    def __init__(self, table):
+        self._table = table
+        self._filters = []
+        self._select = None
+        self._sort = None
+        self._limit = None
+
+    def _extend(self, **changes):
+        query = Query(self._table)
+        query._filters = list(self._filters)
+        query._select = self._select
+        query._sort = self._sort
+        query._limit = self._limit
+        for name, value in changes.items():
+            setattr(query, name, value)
+        return query
+
+    def where(self, column, op, value):
+        """Добавляет условие (условия объединяются через И)"""
+        return self._extend(_filters=self._filters + [_Filter(self._table, column, op, value)])
+
+    def select(self, *columns):
+        """Оставляет в результате только указанные колонки"""
+        if not columns:
+            raise TableError("No columns provided")
+        return self._extend(_select=[self._table._resolve_column(col) for col in columns])
+
+    def sort_by(self, column, descending=False):
+        """Сортирует результат по колонке (None - в конце)"""
+        return self._extend(_sort=(self._table._resolve_column(column), descending))
+
+    def limit(self, n):
+        """Ограничивает число строк результата"""
+        if n < 0:
+            raise TableError(f"Invalid limit: {n}")
+        return self._extend(_limit=n)
+
+    # === Выполнение ===
+
+    def _candidates(self):
+        """Строки, которые нужно проверить: по сортированному индексу или индексу первой колонки"""
+        table = self._table
+        n_rows = len(table._data)
+        for flt in self._filters:
+            if flt.op in RANGE_OPS and flt.value is not None:
+                index = table._sorted_index(flt.col_idx)
+                if index is not None:
+                    return table._local_rows(index.range(**RANGE_OPS[flt.op](flt.value)))
+        if table._columns and table._columns[0] in table._typed:
+            for flt in self._filters:
+                if flt.col_idx == 0 and flt.op in ('==', 'in'):
+                    values = [flt.value] if flt.op == '==' else list(flt.value)
+                    values = [v for v in values if v is not None]
+                    return table._find_by_index(values) if values else []
+        return range(n_rows)
+
+    def positions(self):
+        """Номера строк результата в исходной таблице"""
+        table = self._table
+        candidates = self._candidates()
+        # Ограничение проталкивается в сканирование, если нет сортировки
+        stop_at = self._limit if self._sort is None else None
+
+        # Категориальные колонки фильтруются сравнением кодов, а не строк
+        code_filters = {}
+        for flt in self._filters:
+            category = table._category_column(flt.col_idx)
+            if category is not None and table._columns[flt.col_idx] in table._typed:
+                code_filters[id(flt)] = (category.values, flt.matching_codes(category))
+        root_positions = table._positions
+
+        result = []
+        for start in range(0, len(candidates), BLOCK_ROWS):
+            block = candidates[start:start + BLOCK_ROWS]
+            for flt in self._filters:
+                if not block:
+                    break
+                if id(flt) in code_filters:
+                    codes, matching = code_filters[id(flt)]
+                    if root_positions is None:
+                        block = [p for p in block if codes[p] in matching]
+                    else:
+                        block = [p for p in block if codes[root_positions[p]] in matching]
+                    continue
+                values = column_cells(table, flt.col_idx, block)
+                block = [p for p, cell in zip(block, values) if flt.matches(cell)]
+            result.extend(block)
+            if stop_at is not None and len(result) >= stop_at:
+                break
+
+        if self._sort is not None:
+            col_idx, descending = self._sort
+            keys = column_cells(table, col_idx, result)
+            present = [(k, p) for k, p in zip(keys, result) if k is not None]
+            missing = [p for k, p in zip(keys, result) if k is None]
+            try:
+                present.sort(key=operator.itemgetter(0), reverse=descending)
+            except TypeError:
+                raise TableError(f"Column {self._table._columns[col_idx]} is not sortable")
+            result = [p for _, p in present] + missing
+
+        if self._limit is not None:
+            result = result[:self._limit]
+        return result
+
+    def execute(self, copy_table=True):
+        """Выполняет план: новая таблица (или представление при copy_table=False)"""
+        table = self._table
+        positions = self.positions()
+
+        if not copy_table:
+            if self._select is not None:
+                raise TableError("Projection requires copy_table=True")
+            return table._make_view(positions)
+
+        col_indexes = self._select if self._select is not None else range(len(table._columns))
+        # Приводятся и копируются только выбранные колонки
+        columns = [column_cells(table, col_idx, positions) for col_idx in col_indexes]
+        names = [table._columns[col_idx] for col_idx in col_indexes]
+        types = {table._columns[col_idx]: table._type_vec[col_idx] for col_idx in col_indexes}
+
+        rows = [list(row) for row in zip(*columns)] if columns else []
+        result = Table._from_rows(rows, names, types)
+        result._typed = set(names)
+        if table.storage == 'columns':
+            result.set_storage('columns')
+        return result
+
+    def __repr__(self):
+        return (f"Query(filters={len(self._filters)}, select={self._select}, "
+                f"sort={self._sort}, limit={self._limit})")
@@ -0,0 +1,49 @@
+MAX_CELL_WIDTH = 30
+# Сколько строк просматривается для ширины колонок при выводе всей таблицы
+WIDTH_SAMPLE_ROWS = 1000
+
+
+def _format_row(cells, widths):
+    parts = []
+    for i, width in enumerate(widths):
+        cell = cells[i] if i < len(cells) else ""
+        parts.append(f"{cell[:MAX_CELL_WIDTH]:<{width}}")
+    return " | ".join(parts)
+
+
+def render_lines(table, max_rows=20, sample_rows=None):
+    """Строки текстового представления таблицы (заголовок, разделитель, данные).
+    
+    Ширина колонок считается за один проход по первым sample_rows строкам,
+    их строковые представления переиспользуются при выводе (значения дальше
+    образца могут оказаться шире колонки). max_rows=None - вся таблица;
+    строки выдаются по одной, поэтому память не зависит от размера.
+    """
+    n_rows = len(table._data)
+    limit = n_rows if max_rows is None else min(max_rows, n_rows)
+    if sample_rows is None:
+        sample_rows = limit if max_rows is not None else WIDTH_SAMPLE_ROWS
+    sample_rows = min(sample_rows, limit)
+    
+    # Читаются только выводимые строки: колоночное хранилище не разворачивается целиком
+    data = table._data
+    head = [[str(cell) for cell in row] for row in data[:sample_rows]]
+    
+    widths = []
+    for i, col in enumerate(table._columns):
+        width = len(str(col))
+        for cells in head:
+            if i < len(cells) and len(cells[i]) > width:
+                width = len(cells[i])
+        widths.append(min(width, MAX_CELL_WIDTH))
+    
+    header = " | ".join(f"{str(col):<{widths[i]}}" for i, col in enumerate(table._columns))
+    yield header
+    yield "-" * len(header)
+    
+    for cells in head:
+        yield _format_row(cells, widths)
+    del head
+    for start in range(sample_rows, limit, WIDTH_SAMPLE_ROWS):
+        for row in data[start:min(start + WIDTH_SAMPLE_ROWS, limit)]:
+            yield _format_row([str(cell) for cell in row], widths)
@@ -0,0 +1,135 @@
+from bisect import bisect_right
+from itertools import chain
+from .base_table import Table
+
+
+def _read(segment, col_idx):
+    reader = getattr(segment, 'read_column', None)
+    if reader is not None:
+        return reader(col_idx)
+    return [row[col_idx] for row in segment]
+
+
+class SegmentedRows:
+    """Строки таблицы, собранные из нескольких сегментов без их склейки.
+
+    Сегменты (списки строк или другие хранилища) используются как есть;
+    склейка в один список выполняется только по запросу (compact).
+    """
+
+    def __init__(self, segments):
+        self._segments = [segment for segment in segments if len(segment)]
+        self._tail = None
+        self._reindex()
+
+    def _reindex(self):
+        self._starts = []
+        total = 0
+        for segment in self._segments:
+            self._starts.append(total)
+            total += len(segment)
+        self._length = total
+
+    def _locate(self, i):
+        """Сегмент и номер строки в нем для строки i"""
+        if i < 0:
+            i += self._length
+        if not 0 <= i < self._length:
+            raise IndexError("row index out of range")
+        seg = bisect_right(self._starts, i) - 1
+        return self._segments[seg], i - self._starts[seg]
+
+    @property
+    def segments(self):
+        return list(self._segments)
+
+    def compact(self):
+        """Склеивает сегменты в один список строк"""
+        rows = []
+        for segment in self._segments:
+            rows.extend(segment)
+        return rows
+
+    # === Протокол хранилища ===
+
+    def read_column(self, col_idx):
+        values = []
+        for segment in self._segments:
+            values.extend(_read(segment, col_idx))
+        return values
+
+    def write_column(self, col_idx, values, col_type=None):
+        for start, segment in zip(self._starts, self._segments):
+            part = values[start:start + len(segment)]
+            writer = getattr(segment, 'write_column', None)
+            if writer is not None:
+                writer(col_idx, part, col_type=col_type)
+            else:
+                for row, value in zip(segment, part):
+                    row[col_idx] = value
+
+    def get_cell(self, row_idx, col_idx):
+        segment, i = self._locate(row_idx)
+        getter = getattr(segment, 'get_cell', None)
+        return getter(i, col_idx) if getter is not None else segment[i][col_idx]
+
+    def set_cell(self, row_idx, col_idx, value):
+        segment, i = self._locate(row_idx)
+        setter = getattr(segment, 'set_cell', None)
+        if setter is not None:
+            setter(i, col_idx, value)
+        else:
+            segment[i][col_idx] = value
+
+    def extend(self, rows):
+        # Новые строки попадают в собственный сегмент, загруженные не меняются
+        if self._tail is None:
+            self._tail = []
+            self._segments.append(self._tail)
+            self._starts.append(self._length)
+        before = len(self._tail)
+        self._tail.extend(rows)
+        self._length += len(self._tail) - before
+
+    # === Последовательность строк ===
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._length))]
+        segment, j = self._locate(i)
+        return segment[j]
+
+    def __iter__(self):
+        return chain.from_iterable(self._segments)
+
+
+def merge_tables(tables, files):
+    """Таблица из частей, загруженных из files по отдельности: части - сегменты без склейки.
+
+    Пропущенные (None) части и части без колонок (пустые файлы) не учитываются;
+    колонка остается приведенной, только если она приведена во всех частях.
+    """
+    loaded = [(file_path, table) for file_path, table in zip(files, tables) if table is not None]
+    parts = [(file_path, table) for file_path, table in loaded if table._columns]
+    if not parts:
+        return loaded[0][1]
+    first = parts[0][1]
+    typed = set(first._typed)
+    for file_path, table in parts[1:]:
+        if table._columns != first._columns:
+            raise ValueError(f"Column mismatch in {file_path}")
+        typed = {col for col in typed & table._typed
+                 if first._column_types.get(col) == table._column_types.get(col)}
+
+    # Представления сначала материализуются
+    segments = [table._data if table._parent is None else list(table._data) for _, table in parts]
+    merged = Table(None, first._columns, first._column_types)
+    merged._data = segments[0] if len(segments) == 1 else SegmentedRows(segments)
+    merged._typed = typed
+    if len(parts) == 1 and first._parent is None:
+        # Позиции индексов совпадают с номерами строк только для одной части
+        merged._indexes = first._indexes
+    return merged
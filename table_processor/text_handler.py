@@ -1,38 +1,31 @@
-def save_text(table, file_path, max_rows=50):
-    """Сохранение в читаемый текстовый файл"""
+from .rendering import render_lines
+from .profiling import instrumented
+
+def iter_text(table, max_rows=50, sample_rows=None):
+    """Строки текстового файла с таблицей (max_rows=None - вся таблица)"""
+    yield f"Table: {len(table._data)} rows, {len(table._columns)} columns"
+    yield "=" * 60
+    yield ""
+    
+    if not table._data:
+        yield "Empty table"
+        return
+    
+    yield from render_lines(table, max_rows, sample_rows)
+    
+    if max_rows is not None and len(table._data) > max_rows:
+        yield ""
+        yield f"... and {len(table._data) - max_rows} more rows"
+
+@instrumented('save_text')
+def save_text(table, file_path, max_rows=50, sample_rows=None, block_lines=1000):
+    """Сохранение в читаемый текстовый файл (строки пишутся блоками по block_lines)"""
     with open(file_path, 'w', encoding='utf-8') as f:
-        f.write(f"Table: {len(table._data)} rows, {len(table._columns)} columns\n")
-        f.write("=" * 60 + "\n\n")
-        
-        if not table._data:
-            f.write("Empty table\n")
-            return
-        
-        # Копируем логику print_table
-        widths = []
-        for i, col in enumerate(table._columns):
-            width = len(str(col))
-            for j in range(min(max_rows, len(table._data))):
-                if i < len(table._data[j]):
-                    cell = str(table._data[j][i])
-                    width = max(width, len(cell))
-            widths.append(min(width, 30))
-        
-        # Заголовок
-        header = " | ".join(f"{col:<{widths[i]}}" for i, col in enumerate(table._columns))
-        f.write(header + "\n")
-        f.write("-" * len(header) + "\n")
-        
-        # Данные
-        for j in range(min(max_rows, len(table._data))):
-            row_parts = []
-            for i in range(len(table._columns)):
-                if i < len(table._data[j]):
-                    cell = str(table._data[j][i])[:30]
-                    row_parts.append(f"{cell:<{widths[i]}}")
-                else:
-                    row_parts.append(" " * widths[i])
-            f.write(" | ".join(row_parts) + "\n")
-        
-        if len(table._data) > max_rows:
-            f.write(f"\n... and {len(table._data) - max_rows} more rows\n")
+        block = []
+        for line in iter_text(table, max_rows, sample_rows):
+            block.append(line)
+            if len(block) >= block_lines:
+                f.write("\n".join(block) + "\n")
+                block = []
+        if block:
+            f.write("\n".join(block) + "\n")
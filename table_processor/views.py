@@ -0,0 +1,103 @@
+from collections.abc import Sequence
+
+
+class ColumnView(Sequence):
+    """Неизменяемое представление колонки таблицы без копирования значений"""
+
+    def __init__(self, table, col_idx, caster=None):
+        self._table = table
+        self._col_idx = col_idx
+        self._caster = caster
+
+    def __len__(self):
+        return len(self._table._data)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        data = self._table._data
+        getter = getattr(data, 'get_cell', None)
+        if getter is not None:
+            if i < 0:
+                i += len(data)
+            value = getter(i, self._col_idx)
+        else:
+            value = data[i][self._col_idx]
+        return self._caster(value) if self._caster is not None else value
+
+    def __iter__(self):
+        data = self._table._data
+        col_idx = self._col_idx
+        if hasattr(data, 'read_column'):
+            values = data.read_column(col_idx)
+        else:
+            values = (row[col_idx] for row in data)
+        if self._caster is None:
+            yield from values
+        else:
+            caster = self._caster
+            for value in values:
+                yield caster(value)
+
+    def __repr__(self):
+        return f"ColumnView({list(self)!r})"
+
+
+class RowView:
+    """Окно над строками корневой таблицы: номера строк без копирования данных.
+
+    Обращается к root._data при каждом доступе, поэтому остается
+    корректным, если корневая таблица сменит хранилище.
+    """
+
+    def __init__(self, root, positions):
+        self._root = root
+        self._positions = positions
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __getitem__(self, i):
+        data = self._root._data
+        if isinstance(i, slice):
+            return [data[p] for p in self._positions[i]]
+        return data[self._positions[i]]
+
+    def __iter__(self):
+        data = self._root._data
+        positions = self._positions
+        if isinstance(data, list) and isinstance(positions, range) and positions.step == 1:
+            return iter(data[positions.start:positions.stop])
+        return (data[p] for p in positions)
+
+    def read_column(self, col_idx):
+        data = self._root._data
+        getter = getattr(data, 'get_cell', None)
+        if getter is not None:
+            return [getter(p, col_idx) for p in self._positions]
+        return [row[col_idx] for row in self]
+
+    def write_column(self, col_idx, values, col_type=None):
+        data = self._root._data
+        setter = getattr(data, 'set_cell', None)
+        if setter is not None:
+            for p, value in zip(self._positions, values):
+                setter(p, col_idx, value)
+        else:
+            for p, value in zip(self._positions, values):
+                data[p][col_idx] = value
+
+    def get_cell(self, row_idx, col_idx):
+        data = self._root._data
+        pos = self._positions[row_idx]
+        getter = getattr(data, 'get_cell', None)
+        return getter(pos, col_idx) if getter is not None else data[pos][col_idx]
+
+    def set_cell(self, row_idx, col_idx, value):
+        data = self._root._data
+        pos = self._positions[row_idx]
+        setter = getattr(data, 'set_cell', None)
+        if setter is not None:
+            setter(pos, col_idx, value)
+        else:
+            data[pos][col_idx] = value
@@ -6,7 +6,7 @@
 
 import os
 import tempfile
-from table_processor import Table, load_table, save_table
+from table_processor import Table, load_table, save_table, iter_csv
 from datetime import datetime
 
 def cleanup_files(files):
@@ -213,6 +213,1142 @@ def test_datetime():
     
     print("  Дата/время работают корректно!")
 
+def test_key_index():
+    """Тест 7: Индекс по первой колонке"""
+    print("Тест 7: Индекс по первой колонке")
+    
+    table = Table([[i % 5, f"v{i}"] for i in range(20)], ["Key", "Value"])
+    
+    # 7.1 Поиск через индекс совпадает с полным просмотром
+    by_index = table.get_rows_by_index(1, "3")
+    by_scan = table.get_rows_by_index(1, "3", use_index=False)
+    assert list(by_index._data) == list(by_scan._data)
+    assert by_index.get_values("Value") == ["v1", "v3", "v6", "v8", "v11", "v13", "v16", "v18"]
+    
+    # 7.2 Индекс обновляется при изменении первой колонки
+    table.set_values(list(range(20)), "Key")
+    assert table.get_rows_by_index(17).get_value("Value") == "v17"
+    
+    # 7.3 Представление использует индекс родителя
+    view = table.get_rows_by_number(5, 10)
+    assert view.get_rows_by_index(7, 12).get_values("Value") == ["v7"]
+    assert view._get_key_index() is table._get_key_index()
+    
+    # 7.4 Запись через представление обновляет общий индекс
+    view.set_values([100, 101, 102, 103, 104], "Key")
+    assert view.get_rows_by_index(101).get_value("Value") == "v6"
+    assert table.get_rows_by_index(101).get_value("Value") == "v6"
+    
+    # 7.5 После отделения у представления свой индекс
+    view.set_column_types({"Key": "int"}, by_number=False)
+    view.set_values([200, 201, 202, 203, 204], "Key")
+    assert view.get_rows_by_index(201).get_value("Value") == "v6"
+    assert table.get_rows_by_index(101).get_value("Key") == "101"
+    
+    # 7.6 Большая запись сбрасывает индекс, он строится заново при поиске
+    big = Table([[i % 3, i] for i in range(1000)], ["Key", "Value"])
+    big.get_rows_by_index(0)
+    big.set_values([(i + 1) % 3 for i in range(1000)], "Key")
+    assert big._key_index is None
+    assert big.get_rows_by_index(1).get_values("Value")[:3] == ["0", "3", "6"]
+    
+    print("  Индекс по первой колонке работает!")
+
+def test_columnar_storage():
+    """Тест 8: Колоночное хранение"""
+    print("Тест 8: Колоночное хранение")
+    
+    data = [[1, 1.5, True, "a"], [2, None, False, None], [3, 3.5, None, "c"]]
+    columns = ["ID", "Price", "Flag", "Name"]
+    types = {"ID": "int", "Price": "float", "Flag": "bool"}
+    rows_table = Table(data, columns, types)
+    col_table = Table(data, columns, types, storage='columns')
+    
+    # 8.1 Числовые колонки лежат в буферах array
+    assert col_table.storage == 'columns'
+    assert col_table._data.column_kinds() == ['q', 'd', 'b', 'list']
+    
+    # 8.2 Публичный API дает тот же результат
+    for col in columns:
+        assert col_table.get_values(col) == rows_table.get_values(col)
+    assert col_table.get_rows_by_number(1).get_value("Price") is None
+    assert col_table.get_rows_by_index(3).get_value("Flag") is None
+    
+    # 8.3 Запись и смена типа
+    col_table.set_values([10, None, 30], "ID")
+    assert col_table.get_values("ID") == [10, None, 30]
+    col_table.set_column_types({"Name": "str", "ID": "float"}, by_number=False)
+    assert col_table.get_values("ID") == [10.0, None, 30.0]
+    assert col_table._data.column_kinds()[0] == 'd'
+    
+    # 8.4 Обратное преобразование
+    col_table.set_storage('rows')
+    assert col_table._data[2] == [30.0, 3.5, None, "c"]
+    
+    print("  Колоночное хранение работает!")
+
+def test_csv_streaming():
+    """Тест 9: Потоковое чтение CSV"""
+    print("Тест 9: Потоковое чтение CSV")
+    
+    import csv
+    
+    files = ["stream1.csv", "stream2.csv", "stream_bad.csv"]
+    try:
+        for name, start in (("stream1.csv", 0), ("stream2.csv", 5)):
+            with open(name, "w", newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(["ID", "Value"])
+                for i in range(start, start + 5):
+                    writer.writerow([i, f"v{i}"])
+        with open("stream_bad.csv", "w", newline='') as f:
+            csv.writer(f).writerow(["ID", "Other"])
+        
+        # 9.1 Чанки фиксированного размера через границу файлов
+        chunks = list(iter_csv("stream1.csv", "stream2.csv", chunk_rows=4))
+        assert [len(chunk._data) for chunk in chunks] == [4, 4, 2]
+        assert chunks[1].get_values("Value") == ["v4", "v5", "v6", "v7"]
+        
+        # 9.2 load_csv по частям дает ту же таблицу
+        table = load_table("stream1.csv", "stream2.csv", chunk_rows=3, detect_types=True)
+        assert table._data == load_table("stream1.csv", "stream2.csv", detect_types=True)._data
+        assert table.get_values("ID") == list(range(10))
+        header_only = load_table("stream_bad.csv", chunk_rows=3)
+        assert header_only._columns == ["ID", "Other"] and len(header_only._data) == 0
+        
+        # 9.3 Проверка заголовков сохраняется
+        try:
+            list(iter_csv("stream1.csv", "stream_bad.csv", chunk_rows=2))
+            assert False, "Должна быть ошибка несовпадения колонок"
+        except ValueError:
+            pass
+        
+        print("  Потоковое чтение CSV работает!")
+        
+    finally:
+        cleanup_files(files)
+
+def test_type_detection_engine():
+    """Тест 10: Определение типов по колонке"""
+    print("Тест 10: Определение типов по колонке")
+    
+    from table_processor.casting import detect_column_type, make_caster
+    
+    # 10.1 Классификация образца за один проход
+    assert detect_column_type(["1", " 2 ", "-3", None]) == ('int', None)
+    assert detect_column_type(["1.5", "1e3", "2"]) == ('float', None)
+    assert detect_column_type(["yes", "no", ""]) == ('bool', None)
+    assert detect_column_type(["25.12.2023", "01.01.2024"]) == ('datetime', '%d.%m.%Y')
+    assert detect_column_type(["2023-02-30", "abc"]) == ('str', None)
+    
+    # 10.2 Приведение переиспользует найденный формат
+    caster = make_caster('datetime', '%d.%m.%Y')
+    assert caster(" 25.12.2023 ") == datetime(2023, 12, 25)
+    assert caster("2024-01-01 10:30:00") == datetime(2024, 1, 1, 10, 30)
+    assert caster.fmt == '%Y-%m-%d %H:%M:%S'
+    assert caster("not a date") is None
+    assert make_caster('float')(10 ** 400) is None
+    
+    # 10.3 Таблица использует формат, найденный при определении
+    table = Table([["01.02.2023"], ["15.03.2023"]], ["Date"])
+    table.auto_detect_column_types()
+    assert table.get_values("Date") == [datetime(2023, 2, 1), datetime(2023, 3, 15)]
+    
+    print("  Определение типов по колонке работает!")
+
+def test_typed_storage():
+    """Тест 11: Хранение приведенных значений"""
+    print("Тест 11: Хранение приведенных значений")
+    
+    from table_processor.views import ColumnView
+    
+    table = Table([["1", "2.5"], ["2", None], ["x", "4"]], ["A", "B"], {"A": "int"})
+    
+    # 11.1 Пока значения не приведены, get_values приводит их при чтении
+    assert "A" not in table._typed
+    assert table.get_values("A") == [1, 2, None]
+    assert table._data[0][0] == "1"
+    
+    # 11.2 После смены типа хранятся приведенные значения
+    table.set_column_types({"B": "float"}, by_number=False)
+    assert "B" in table._typed
+    assert table.get_values("B") == [2.5, None, 4.0]
+    
+    # 11.3 Представление без копирования доступно только для чтения
+    view = table.get_values("B", copy=False)
+    assert isinstance(view, ColumnView)
+    assert list(view) == [2.5, None, 4.0] and view[-1] == 4.0 and len(view) == 3
+    table.set_values([1, 2, 3], "B")
+    assert list(view) == [1.0, 2.0, 3.0]
+    try:
+        view[0] = 10
+        assert False, "Представление должно быть только для чтения"
+    except TypeError:
+        pass
+    
+    print("  Хранение приведенных значений работает!")
+
+def test_row_views():
+    """Тест 12: Представления строк без копирования"""
+    print("Тест 12: Представления строк без копирования")
+    
+    from table_processor.views import RowView
+    
+    for storage in ('rows', 'columns'):
+        table = Table([[i, i * 10] for i in range(100)], ["ID", "Value"],
+                      {"ID": "int", "Value": "int"}, storage=storage)
+        
+        # 12.1 Представление - окно над строками родителя
+        page = table.get_rows_by_number(20, 30)
+        assert isinstance(page._data, RowView) and page._positions == range(20, 30)
+        assert page.get_values("Value") == list(range(200, 300, 10))
+        
+        # 12.2 Запись через представление видна в родителе
+        page.set_values(list(range(10)), "Value")
+        assert table.get_values("Value")[20:30] == list(range(10))
+        page.get_rows_by_number(3).set_value(-1, "Value")
+        assert table.get_rows_by_number(23).get_value("Value") == -1
+        
+        # 12.3 Изменения родителя видны в представлении
+        table.set_values(list(range(100, 200)), "Value")
+        assert page.get_values("Value") == list(range(120, 130))
+        
+        # 12.4 Изменение схемы отделяет представление
+        page.set_column_types({"Value": "str"}, by_number=False)
+        assert page.get_values("Value")[0] == "120"
+        assert table.get_column_types(by_number=False)["Value"] == "int"
+        assert table.get_values("Value")[20] == 120
+        assert page.storage == storage
+    
+    print("  Представления строк работают!")
+
+def test_columnar_format():
+    """Тест 13: Бинарный колоночный формат"""
+    print("Тест 13: Бинарный колоночный формат")
+    
+    data = [
+        [1, "Alice", 1.5, True, "2023-01-15 10:30:00", None],
+        [2, None, None, False, None, "x"],
+        [3, "Юникод", 2.25, None, "2024-02-29", 10 ** 30]
+    ]
+    columns = ["ID", "Name", "Score", "Flag", "When", "Misc"]
+    table = Table(data, columns)
+    table.set_column_types({0: "int", 2: "float", 3: "bool", 4: "datetime"})
+    
+    path = "test_columnar.tcol"
+    try:
+        save_table(table, path)
+        
+        # 13.1 Колонки читаются лениво
+        loaded = load_table(path)
+        assert loaded._data.column_kinds() == ['lazy'] * 6
+        assert loaded.get_values("Score") == [1.5, None, 2.25]
+        assert loaded._data.column_kinds()[2] == 'd'
+        assert loaded._data.column_kinds()[0] == 'lazy'
+        
+        # 13.2 Значения и типы совпадают
+        assert loaded.get_column_types() == table.get_column_types()
+        for col in columns:
+            assert loaded.get_values(col) == table.get_values(col)
+        
+        # 13.3 Загрузка нескольких файлов
+        both = load_table(path, path)
+        assert len(both._data) == 6
+        assert both.get_values("When")[3] == datetime(2023, 1, 15, 10, 30)
+        
+        print("  Бинарный колоночный формат работает!")
+        
+    finally:
+        cleanup_files([path])
+
+def test_parallel_loading():
+    """Тест 14: Параллельная загрузка нескольких файлов"""
+    print("Тест 14: Параллельная загрузка нескольких файлов")
+    
+    import csv
+    
+    files = [f"shard{i}.csv" for i in range(4)] + ["shard_bad.csv", "shard0.pkl", "shard1.pkl",
+                                                   "shard_bool.csv", "shard_int.csv"]
+    try:
+        for i in range(4):
+            with open(f"shard{i}.csv", "w", newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(["ID", "Amount", "Note"])
+                for j in range(10 + i * 3, 13 + i * 3):
+                    # В последней части суммы дробные
+                    writer.writerow([j, f"{j}.5" if i == 3 else j, "" if j % 2 else f"n{j}"])
+        with open("shard_bad.csv", "w", newline='') as f:
+            csv.writer(f).writerow(["ID", "Other", "Note"])
+        
+        # 14.1 Порядок файлов и данные совпадают с последовательной загрузкой
+        shards = [f"shard{i}.csv" for i in range(4)]
+        parallel = load_table(*shards, workers=2)
+        assert list(parallel._data) == list(load_table(*shards)._data)
+        
+        # 14.2 Типы частей сводятся в общий тип
+        typed = load_table(*shards, workers=2, detect_types=True)
+        assert typed.get_column_types(by_number=False) == {"ID": "int", "Amount": "float", "Note": "str"}
+        assert typed.get_values("Amount")[-1] == 21.5
+        
+        # 14.3 Несовпадение колонок обнаруживается
+        try:
+            load_table("shard0.csv", "shard_bad.csv", workers=2)
+            assert False, "Должна быть ошибка несовпадения колонок"
+        except ValueError:
+            pass
+        
+        # 14.4 Pickle файлы
+        save_table(load_table("shard0.csv"), "shard0.pkl")
+        save_table(load_table("shard1.csv"), "shard1.pkl")
+        loaded = load_table("shard0.pkl", "shard1.pkl", workers=2, detect_types=True)
+        assert loaded.get_values("ID") == list(range(10, 16))
+        
+        # 14.5 Часть из одних 0/1 (bool по образцу) и целочисленная часть дают int
+        for name, values in (("shard_bool.csv", [0, 1]), ("shard_int.csv", [1, 2, 3, 4])):
+            with open(name, "w", newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(["x"])
+                writer.writerows([v] for v in values)
+        mixed = load_table("shard_bool.csv", "shard_int.csv", workers=2, detect_types=True)
+        serial = load_table("shard_bool.csv", "shard_int.csv", detect_types=True)
+        assert mixed.get_column_types() == serial.get_column_types() == {0: "int"}
+        assert mixed.get_values("x") == [0, 1, 1, 2, 3, 4]
+        
+        print("  Параллельная загрузка работает!")
+        
+    finally:
+        cleanup_files(files)
+
+def test_segmented_pickle():
+    """Тест 15: Загрузка pickle частей без склейки"""
+    print("Тест 15: Загрузка pickle частей без склейки")
+    
+    import pickle
+    from table_processor.segments import SegmentedRows
+    
+    files = [f"segment{i}.pkl" for i in range(3)]
+    try:
+        first = Table([[0, "a"], [1, "b"]], ["ID", "Name"], {"ID": "int"})
+        with open(files[0], "wb") as f:
+            pickle.dump(first, f)
+        save_table(Table([[2, "c"]], ["ID", "Name"]), files[1])
+        save_table(Table([[3, "d"], [4, None]], ["ID", "Name"]), files[2])
+        
+        # 15.1 Части хранятся сегментами
+        table = load_table(*files)
+        assert isinstance(table._data, SegmentedRows)
+        assert [len(segment) for segment in table._data.segments] == [2, 1, 2]
+        assert table.get_values("ID") == [0, 1, 2, 3, 4]
+        assert table.get_rows_by_number(1, 4).get_values("Name") == ["b", "c", "d"]
+        assert table.get_rows_by_index(3).get_value("Name") == "d"
+        
+        # 15.2 Запись через сегменты, исходный объект Table не растет
+        table.set_values(["x", "y", "z", "w", "v"], "Name")
+        assert table._data[2] == [2, "z"]
+        with open(files[0], "rb") as f:
+            assert len(pickle.load(f)._data) == 2
+        
+        # 15.3 Склейка по запросу
+        table.compact()
+        assert isinstance(table._data, list) and len(table._data) == 5
+        assert table.get_values("Name") == ["x", "y", "z", "w", "v"]
+        
+        print("  Загрузка pickle частей работает!")
+        
+    finally:
+        cleanup_files(files)
+
+def test_text_rendering():
+    """Тест 16: Потоковый текстовый вывод"""
+    print("Тест 16: Потоковый текстовый вывод")
+    
+    from table_processor import iter_text
+    
+    table = Table([[i, "x" * (i % 7)] for i in range(500)], ["ID", "Text"])
+    
+    # 16.1 Вся таблица выдается генератором строк
+    lines = iter_text(table, max_rows=None, sample_rows=10)
+    assert next(lines) == "Table: 500 rows, 2 columns"
+    lines = list(lines)
+    assert len(lines) == 2 + 2 + 500
+    assert lines[2] == "ID | Text  "
+    # Ширина взята из образца, более длинные значения не обрезаются
+    assert lines[4] == "0  |       "
+    assert lines[-1] == "499 | xx    "
+    
+    # 16.2 save_text пишет то же самое блоками
+    path = "test_render.txt"
+    try:
+        save_table(table, path, file_type='txt', max_rows=None, sample_rows=10, block_lines=64)
+        with open(path, encoding='utf-8') as f:
+            assert f.read().splitlines() == ["Table: 500 rows, 2 columns"] + lines
+    finally:
+        cleanup_files([path])
+    
+    # 16.3 Колоночное хранилище читается только в выводимых строках
+    from table_processor.column_store import ColumnStore
+    rows = [[i, f"n{i}"] for i in range(2500)]
+    columnar = Table([list(row) for row in rows], ["ID", "Name"], storage="columns")
+    expected = list(iter_text(Table(rows, ["ID", "Name"]), max_rows=None))
+    original_iter = ColumnStore.__iter__
+    ColumnStore.__iter__ = None
+    try:
+        assert list(iter_text(columnar, max_rows=5))[-1] == "... and 2495 more rows"
+        assert list(iter_text(columnar, max_rows=None)) == expected
+    finally:
+        ColumnStore.__iter__ = original_iter
+    
+    print("  Потоковый текстовый вывод работает!")
+
+def test_column_lookup():
+    """Тест 17: Карта имен колонок и вектор типов"""
+    print("Тест 17: Карта имен колонок и вектор типов")
+    
+    columns = [f"c{i}" for i in range(2000)]
+    table = Table([list(range(2000))], columns)
+    
+    # 17.1 Поиск по имени через словарь
+    assert table._col_pos["c1999"] == 1999
+    assert table.get_value("c1999") == "1999"
+    table.set_column_types({f"c{i}": "int" for i in range(0, 2000, 2)}, by_number=False)
+    assert table._type_vec[:3] == ["int", "str", "int"]
+    assert table.get_column_types()[1998] == "int"
+    
+    # 17.2 Представления разделяют карту и вектор типов
+    view = table.get_rows_by_number(0)
+    assert view._col_pos is table._col_pos and view._type_vec is table._type_vec
+    table.set_column_types({1: "float"})
+    assert view.get_value("c1") == 1.0
+    
+    # 17.3 После отделения представление меняет только свою схему
+    view.set_column_types({"c3": "int"}, by_number=False)
+    assert view._type_vec[3] == "int" and table._type_vec[3] == "str"
+    
+    # 17.4 Ошибки при неизвестной колонке
+    from table_processor.base_table import TableError
+    for bad in ("missing", 2000):
+        try:
+            table.set_values([1], bad)
+            assert False, "Должна быть ошибка колонки"
+        except TableError:
+            pass
+    
+    print("  Карта имен колонок работает!")
+
+def test_query_engine():
+    """Тест 18: Запросы where/select/sort_by/limit"""
+    print("Тест 18: Запросы where/select/sort_by/limit")
+    
+    from table_processor.base_table import TableError
+    rows = [[str(i), f"{i * 1.5}", ["a", "b", "c"][i % 3]] for i in range(10000)]
+    rows[5][1] = ""
+    table = Table(rows, ["ID", "Price", "Tag"])
+    table.set_column_types({"ID": "int", "Price": "float"}, by_number=False)
+    
+    # 18.1 Фильтр, проекция и сортировка
+    result = table.where("Price", ">=", 14995).where("Tag", "!=", "a").select("Tag", "ID").execute()
+    assert result._columns == ["Tag", "ID"]
+    assert result.get_column_types() == {0: "str", 1: "int"}
+    assert result.get_values("ID") == [9997, 9998]
+    
+    query = table.where("Tag", "in", ["b"]).sort_by("Price", descending=True).limit(3)
+    assert query.execute().get_values("ID") == [9997, 9994, 9991]
+    assert table.sort_by("Price").limit(2).execute().get_values("ID") == [0, 1]
+    # None - в конце сортировки и не проходит сравнения
+    assert table.sort_by("Price").execute().get_values("ID")[-1] == 5
+    assert table.where("Price", "==", None).execute().get_values("ID") == [5]
+    
+    # 18.2 Значение условия приводится к типу колонки, ID ищется через индекс
+    assert table.where("ID", "==", "42").execute().get_value("Price") == 63.0
+    assert table.where("ID", "in", [3, 7, 100000]).execute().get_values(0) == [3, 7]
+    
+    # 18.3 Ограничение без сортировки останавливает сканирование
+    assert table.where("Tag", "==", "c").limit(2).execute().get_values("ID") == [2, 5]
+    assert len(table.limit(0).execute()._data) == 0
+    
+    # 18.4 copy_table=False дает представление над исходными строками
+    view = table.where("Tag", "==", "a").limit(2).execute(copy_table=False)
+    view.set_values([-1.0, -2.0], "Price")
+    assert table.get_values("Price")[:4] == [-1.0, 1.5, 3.0, -2.0]
+    try:
+        table.select("ID").execute(copy_table=False)
+        assert False, "Должна быть ошибка проекции"
+    except TableError:
+        pass
+    try:
+        table.where("ID", "~", 1)
+        assert False, "Должна быть ошибка оператора"
+    except TableError:
+        pass
+    for op in ("==", "!="):
+        try:
+            table.where("ID", op, "abc")
+            assert False, "Неприводимое значение не должно становиться условием на None"
+        except TableError:
+            pass
+    
+    # 18.5 Запрос к представлению возвращает его номера строк
+    part = table.get_rows_by_number(100, 200)
+    assert part.where("ID", "==", 150).execute().get_values(0) == [150]
+    
+    print("  Запросы работают!")
+
+def test_group_by():
+    """Тест 19: Группировка и агрегаты"""
+    print("Тест 19: Группировка и агрегаты")
+    
+    from table_processor.base_table import TableError
+    rows = [[str(i), ["a", "b", "c"][i % 3], str(i % 5), f"{i}.5"] for i in range(3000)]
+    rows[0][3] = ""
+    table = Table(rows, ["ID", "Tag", "Bucket", "Price"])
+    table.set_column_types({"ID": "int", "Bucket": "int", "Price": "float"}, by_number=False)
+    
+    # 19.1 Агрегаты по одной колонке, None пропускаются
+    result = table.group_by("Tag").agg("count", ("Price", "count"), ("ID", "sum"),
+                                       ("ID", "min"), top=("Price", "max"), avg=("Price", "mean"))
+    assert result._columns == ["Tag", "count", "count_Price", "sum_ID", "min_ID", "top", "avg"]
+    assert result.get_column_types() == {0: "str", 1: "int", 2: "int", 3: "int",
+                                         4: "int", 5: "float", 6: "float"}
+    assert result.get_values("Tag") == ["a", "b", "c"]
+    assert result.get_values("count") == [1000, 1000, 1000]
+    assert result.get_values("count_Price") == [999, 1000, 1000]
+    assert result.get_values("sum_ID") == [sum(range(0, 3000, 3)), sum(range(1, 3000, 3)),
+                                           sum(range(2, 3000, 3))]
+    assert result.get_values("top")[0] == 2997.5
+    assert result.get_values("avg")[0] == sum(i + 0.5 for i in range(3, 3000, 3)) / 999
+    
+    # 19.2 Несколько ключей
+    result = table.group_by("Tag", "Bucket").agg(("ID", "count"))
+    assert len(result._data) == 15
+    assert result.get_values("count_ID") == [200] * 15
+    
+    # 19.3 Параллельный режим дает тот же результат
+    serial = table.group_by("Bucket").agg(("ID", "sum"), ("Price", "min"), ("Price", "mean"))
+    parallel = table.group_by("Bucket").agg(("ID", "sum"), ("Price", "min"), ("Price", "mean"),
+                                            workers=2)
+    assert parallel._columns == serial._columns
+    assert parallel.get_values("sum_ID") == serial.get_values("sum_ID")
+    assert parallel.get_values("min_Price") == serial.get_values("min_Price")
+    for a, b in zip(parallel.get_values("mean_Price"), serial.get_values("mean_Price")):
+        assert abs(a - b) < 1e-9
+    
+    # 19.4 Ошибки
+    for bad in (lambda: table.group_by("Tag").agg(("Tag", "sum")),
+                lambda: table.group_by("Tag").agg(("ID", "median")),
+                lambda: table.group_by().agg("count")):
+        try:
+            bad()
+            assert False, "Должна быть ошибка агрегата"
+        except TableError:
+            pass
+    
+    # 19.5 Сумма bool-колонки - int и для группы из одной строки
+    flags = Table([["a", True], ["b", True], ["b", True]], ["K", "F"])
+    flags.set_column_types({"F": "bool"}, by_number=False)
+    sums = flags.group_by("K").agg(("F", "sum")).get_values("sum_F")
+    assert sums == [1, 2] and all(type(v) is int for v in sums)
+    
+    print("  Группировка работает!")
+
+def test_join():
+    """Тест 20: Хеш-соединение таблиц"""
+    print("Тест 20: Хеш-соединение таблиц")
+    
+    from table_processor.base_table import TableError
+    facts = Table([[str(i), str(i % 4), f"{i}.0"] for i in range(10)] + [["10", "", "1.0"]],
+                  ["ID", "Ref", "Amount"])
+    facts.set_column_types({"ID": "int", "Ref": "int", "Amount": "float"}, by_number=False)
+    refs = Table([["0", "zero", "x"], ["1", "one", "y"], ["2", "two", "z"], ["2", "deux", "w"]],
+                 ["Ref", "Name", "Amount"])
+    refs.set_column_types({"Ref": "int"}, by_number=False)
+    
+    # 20.1 Inner: хеш по меньшей таблице, ключ выводится один раз, имена без конфликтов
+    result = facts.join(refs, on="Ref")
+    assert result._columns == ["ID", "Ref", "Amount", "Name", "Amount_right"]
+    assert result.get_column_types() == {0: "int", 1: "int", 2: "float", 3: "str", 4: "str"}
+    assert sorted(result.get_values("ID")) == [0, 1, 2, 2, 4, 5, 6, 6, 8, 9]
+    assert result.where("ID", "==", 2).execute().get_values("Name") == ["two", "deux"]
+    
+    # Хеш по левой (меньшей) таблице дает те же пары
+    swapped = refs.join(facts, on="Ref")
+    assert sorted(zip(swapped.get_values("ID"), swapped.get_values("Name"))) == \
+        sorted(zip(result.get_values("ID"), result.get_values("Name")))
+    
+    # 20.2 Left: все строки левой таблицы по порядку, None без совпадения и для ключа None
+    result = facts.join(refs, on="Ref", how="left")
+    assert result.get_values("ID") == [0, 1, 2, 2, 3, 4, 5, 6, 6, 7, 8, 9, 10]
+    assert result.get_values("Name")[4] is None and result.get_values("Name")[-1] is None
+    
+    # 20.3 Разные имена ключей сохраняют обе колонки
+    named = Table([["1", "a"]], ["Key", "Ref"])
+    named.set_column_types({"Key": "int"}, by_number=False)
+    result = facts.join(named, on="ID", right_on="Key")
+    assert result._columns == ["ID", "Ref", "Amount", "Key", "Ref_right"]
+    assert result.get_values("Ref_right") == ["a"]
+    
+    try:
+        facts.join(refs, on="Ref", how="outer")
+        assert False, "Должна быть ошибка типа соединения"
+    except TableError:
+        pass
+    
+    print("  Соединение работает!")
+
+def test_row_append():
+    """Тест 21: Добавление и вставка строк"""
+    print("Тест 21: Добавление и вставка строк")
+    
+    from table_processor.base_table import TableError
+    table = Table([["1", "1.5", "x"], ["2", "2.5"]], ["ID", "Price", "Tag"])
+    assert table._data[1] == ["2", "2.5", None]
+    table.set_column_types({"ID": "int", "Price": "float"}, by_number=False)
+    
+    # 21.1 Добавление: приведение типов, выравнивание строк, генераторы
+    table.append_row(["3", "3.5", "y", "extra"])
+    table.extend_rows([str(i), f"{i}.5"] for i in range(4, 25004))
+    assert len(table._data) == 25003
+    assert table._data[2] == [3, 3.5, "y"]
+    assert table._data[3] == [4, 4.5, None]
+    assert table.get_values("Price")[-1] == 25003.5
+    
+    # 21.2 Индекс первой колонки и представления остаются согласованными
+    assert table.get_rows_by_index(2).get_value("Price") == 2.5
+    table.append_row(["25004", "0"])
+    assert table.get_rows_by_index(25004).get_value("Price") == 0.0
+    view = table.get_rows_by_number(1, 3)
+    picked = table.get_rows_by_index(5, 6)
+    table.insert_rows(0, [["-1", "0.5"], ["0", "0.0"]])
+    assert table.get_values("ID")[:4] == [-1, 0, 1, 2]
+    assert view.get_values("ID") == [2, 3]
+    assert picked.get_values("ID") == [5, 6]
+    assert table.get_rows_by_index(0).get_value("Price") == 0.0
+    assert table.get_rows_by_index(25004).get_values("ID") == [25004]
+    
+    # 21.3 Колоночное хранение и добавление в представление (отделяет его)
+    columnar = Table([["1", "a"]], ["ID", "Tag"], storage="columns")
+    columnar.set_column_types({"ID": "int"}, by_number=False)
+    columnar.extend_rows([["2", "b"], ["3", "c"]])
+    columnar.insert_rows(1, [["9", "z"]])
+    assert columnar.get_values("ID") == [1, 9, 2, 3]
+    assert columnar.storage == "columns"
+    part = columnar.get_rows_by_number(0, 2)
+    part.append_row(["7", "q"])
+    assert part.get_values("ID") == [1, 9, 7] and len(columnar._data) == 4
+    
+    try:
+        table.insert_rows(10 ** 6, [["1"]])
+        assert False, "Должна быть ошибка позиции"
+    except TableError:
+        pass
+    
+    print("  Добавление строк работает!")
+
+def test_csv_writer():
+    """Тест 22: Дозапись CSV и CsvWriter"""
+    print("Тест 22: Дозапись CSV и CsvWriter")
+    
+    from table_processor import CsvWriter
+    from table_processor.csv_handler import save_csv
+    files = ["writer_test.csv", "writer_other.csv"]
+    try:
+        table = Table([["1", "2024-01-02 03:04:05", ""]], ["ID", "When", "Note"])
+        table.set_column_types({"ID": "int", "When": "datetime"}, by_number=False)
+        save_csv(table, files[0])
+        
+        # 22.1 Дозапись: заголовок не повторяется, datetime в фиксированном формате
+        more = Table([["2", "2024-02-03", "x"]], ["ID", "When", "Note"])
+        more.set_column_types({"ID": "int", "When": "datetime"}, by_number=False)
+        save_csv(more, files[0], append=True, datetime_format="%d.%m.%Y")
+        with open(files[0], encoding="utf-8") as f:
+            assert f.read().splitlines() == ["ID,When,Note", "1,2024-01-02 03:04:05,",
+                                             "2,03.02.2024,x"]
+        loaded = load_table(files[0])
+        loaded.set_column_types({"ID": "int", "When": "datetime"}, by_number=False)
+        assert loaded.get_values("When")[1] == datetime(2024, 2, 3)
+        
+        try:
+            save_csv(Table([["1"]], ["Other"]), files[0], append=True)
+            assert False, "Должна быть ошибка заголовка"
+        except ValueError:
+            pass
+        
+        # 22.2 sync записывает только новые строки
+        growing = Table([["1", "a"]], ["ID", "Tag"])
+        with CsvWriter(files[1], table=growing, batch_rows=2) as writer:
+            writer.sync(growing)
+            growing.extend_rows([str(i), "b"] for i in range(2, 7))
+            writer.sync(growing)
+            writer.sync(growing)
+            assert writer.rows_written == 6
+        assert load_table(files[1]).get_values("ID") == ["1", "2", "3", "4", "5", "6"]
+        
+        with CsvWriter(files[1], columns=["ID", "Tag"], append=True) as writer:
+            writer.write_rows([["7", None]])
+        assert load_table(files[1]).get_values("Tag")[-1] is None
+    finally:
+        cleanup_files(files)
+    
+    print("  Дозапись CSV работает!")
+
+def test_cast_cache():
+    """Тест 23: Кеш приведения повторяющихся значений"""
+    print("Тест 23: Кеш приведения повторяющихся значений")
+    
+    from table_processor.casting import CastCache, make_caster
+    rows = [[str(i), ["01.02.2024", "2024-03-04", ""][i % 3], ["yes", "no"][i % 2]]
+            for i in range(20000)]
+    table = Table(rows, ["ID", "When", "Flag"])
+    table.set_column_types({"ID": "int", "When": "datetime", "Flag": "bool"}, by_number=False)
+    
+    # 23.1 Повторяющиеся значения берутся из кеша, результаты не меняются
+    stats = table.cast_cache_stats()
+    assert stats["When"]["misses"] == 3 and stats["When"]["hits"] == 19997
+    assert stats["Flag"]["enabled"] and stats["Flag"]["cached"] == 2
+    assert table.get_values("When")[:3] == [datetime(2024, 2, 1), datetime(2024, 3, 4), None]
+    
+    # 23.2 Колонка с высокой кардинальностью отключает кеш
+    assert not stats["ID"]["enabled"]
+    assert table.get_values("ID")[-1] == 19999
+    
+    # 23.3 set_values использует тот же кеш колонки
+    table.set_values(["no"] * 20000, "Flag")
+    assert table.cast_cache_stats()["Flag"]["hits"] == 39998
+    assert not any(table.get_values("Flag"))
+    
+    # 23.4 Ограниченный размер LRU
+    cache = CastCache(make_caster("int"), "int", size=2, min_hit_rate=0.0)
+    assert cache.map(["1", "2", "1", "3", "1", "2"]) == [1, 2, 1, 3, 1, 2]
+    assert cache.stats()["cached"] == 2 and cache.hits == 2
+    
+    print("  Кеш приведения работает!")
+
+def test_category_columns():
+    """Тест 24: Категориальные колонки"""
+    print("Тест 24: Категориальные колонки")
+    
+    files = ["category_test.pkl", "category_test.tcol"]
+    countries = ["RU", "DE", "FR", "US"]
+    rows = [[countries[i % 4], str(i), "" if i % 10 == 0 else ["new", "done"][i % 2]]
+            for i in range(2000)]
+    try:
+        # 24.1 Автоопределение и общие объекты строк при построчном хранении
+        table = Table(rows, ["Country", "ID", "Status"])
+        table.auto_detect_column_types(categories=True)
+        assert table.get_column_types() == {0: "category", 1: "int", 2: "category"}
+        mixed = Table([[1], [True], [1.0]], ["A"])
+        mixed.set_column_types({0: "category"})
+        assert mixed.get_values("A") == ["1", "True", "1.0"]
+        values = table.get_values("Country")
+        assert values[0] is values[4] and values[0] == "RU"
+        assert table.get_values("Status")[:3] == [None, "done", "new"]
+        assert table.get_categories("Country") == countries
+        
+        # 24.2 Колоночное хранение: коды и словарь, поиск и фильтр по кодам
+        columnar = Table(rows, ["Country", "ID", "Status"])
+        columnar.set_column_types({"Country": "category", "Status": "category"}, by_number=False)
+        columnar.set_storage("columns")
+        assert columnar._data.column_kinds() == ["category", "list", "category"]
+        assert len(columnar.get_rows_by_index("FR")._data) == 500
+        done = columnar.where("Status", "==", "done").where("Country", "in", ["DE", "US"]).execute()
+        assert len(done._data) == 1000 and done.get_column_types()[0] == "category"
+        assert len(columnar.where("Status", "==", None).execute()._data) == 200
+        view = columnar.get_rows_by_number(10, 20)
+        assert view.where("Country", "==", "DE").execute(copy_table=False).get_values("ID") == \
+            ["13", "17"]
+        columnar.set_values(["XX"] * 2000, "Country")
+        assert columnar.get_categories("Country")[-1] == "XX"
+        
+        # 24.3 Сохранение и загрузка сохраняют тип, словарь и общие строки
+        save_table(table, files[0])
+        loaded = load_table(files[0])
+        assert loaded.get_column_types()[0] == "category"
+        values = loaded.get_values("Country")
+        assert values[0] is values[4]
+        
+        save_table(columnar, files[0])
+        loaded = load_table(files[0])
+        assert loaded._data.column_kinds()[2] == "category"
+        assert loaded.get_values("Status") == columnar.get_values("Status")
+        
+        save_table(table, files[1])
+        loaded = load_table(files[1])
+        assert loaded.get_values("Status") == table.get_values("Status")
+        assert loaded.get_categories("Country") == countries
+        assert loaded._data.column_kinds() == ["category", "lazy", "category"]
+    finally:
+        cleanup_files(files)
+    
+    print("  Категориальные колонки работают!")
+
+def test_profiling():
+    """Тест 25: Инструментирование операций"""
+    print("Тест 25: Инструментирование операций")
+    
+    from table_processor import profile, add_hook, remove_hook
+    test_file = "profile_test.csv"
+    try:
+        table = Table([[str(i), f"{i}.5"] for i in range(1000)], ["ID", "Price"])
+        save_table(table, test_file)
+        
+        # 25.1 Сводка по операциям, включая вложенные
+        with profile(memory=True) as prof:
+            loaded = load_table(test_file, detect_types=True)
+            loaded.get_values("Price")
+            loaded.get_rows_by_index("5")
+        summary = prof.summary()
+        assert summary["load_csv"]["calls"] == 1
+        assert summary["load_csv"]["rows"] == 1000 and summary["load_csv"]["cells"] == 2000
+        assert summary["auto_detect_column_types"]["rows"] == 1000
+        assert summary["get_values"]["rows"] == 1000
+        assert summary["get_rows_by_index"]["rows"] == 1
+        assert summary["load_csv"]["peak_bytes"] > 0
+        assert summary["load_csv"]["seconds"] >= summary["auto_detect_column_types"]["seconds"]
+        
+        # 25.2 Вне profile() ничего не собирается; хуки получают события
+        loaded.get_values("Price")
+        assert prof.summary()["get_values"]["calls"] == 1
+        events = []
+        add_hook(events.append)
+        try:
+            save_table(loaded, test_file)
+        finally:
+            remove_hook(events.append)
+        save_table(loaded, test_file)
+        assert [e["op"] for e in events] == ["save_csv"]
+        assert events[0]["depth"] == 0 and events[0]["rows"] == 1000
+        
+        # 25.3 Глубина вложенности считается отдельно в каждом потоке
+        import threading
+        from table_processor.profiling import instrumented
+        barrier = threading.Barrier(2)
+        inner = instrumented("inner")(lambda: None)
+        
+        @instrumented("outer")
+        def outer():
+            barrier.wait()
+            inner()
+            barrier.wait()
+        
+        with profile() as prof:
+            threads = [threading.Thread(target=outer) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        depths = sorted((e["op"], e["depth"]) for e in prof.events)
+        assert depths == [("inner", 1), ("inner", 1), ("outer", 0), ("outer", 0)]
+    finally:
+        cleanup_files([test_file])
+    
+    print("  Инструментирование работает!")
+
+def test_async_io():
+    """Тест 26: Асинхронные load_table/save_table"""
+    print("Тест 26: Асинхронные load_table/save_table")
+    
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+    from table_processor import aload_table, asave_table
+    files = ["async_1.csv", "async_2.csv", "async_3.pkl", "async_big.csv", "async_big.csv.partial",
+             "async_empty.csv"]
+    
+    async def scenario():
+        table = Table([[str(i), f"{i}.5"] for i in range(2500)], ["ID", "Price"])
+        # 26.1 Сохранение и одновременная загрузка нескольких файлов порциями
+        await asyncio.gather(asave_table(table, files[0]), asave_table(table, files[1]),
+                             asave_table(table, files[2]))
+        assert not os.path.exists(files[0] + ".partial")
+        loaded = await aload_table(files[0], files[1], chunk_rows=1000, concurrency=2,
+                                   detect_types=True)
+        assert len(loaded._data) == 5000
+        assert loaded.get_column_types() == {0: "int", 1: "float"}
+        assert loaded.get_values("ID")[2500] == 0
+        assert len((await aload_table(files[2]))._data) == 2500
+        
+        # Неподдерживаемые параметры отклоняются до загрузки
+        for bad_files, options in (((files[0],), {"workers": 2}), ((files[2],), {"delimiter": ";"})):
+            try:
+                await aload_table(*bad_files, **options)
+                assert False, "Должна быть ошибка параметра"
+            except ValueError:
+                pass
+        
+        # Пустой файл пропускается, как в load_table
+        open(files[5], "w").close()
+        assert len((await aload_table(files[5], files[1]))._data) == 2500
+        
+        # 26.2 Дозапись CSV
+        await asave_table(table, files[0], append=True)
+        assert len((await aload_table(files[0]))._data) == 5000
+        
+        # 26.3 Отмена удаляет частично записанный файл
+        big = Table([[str(i), "x" * 50] for i in range(200000)], ["ID", "Note"])
+        executor = ThreadPoolExecutor(max_workers=1)
+        task = asyncio.ensure_future(asave_table(big, files[3], chunk_rows=100, executor=executor))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        try:
+            await task
+            assert False, "Сохранение должно быть отменено"
+        except asyncio.CancelledError:
+            pass
+        executor.shutdown(wait=True)
+        assert not os.path.exists(files[3]) and not os.path.exists(files[4])
+    
+    try:
+        asyncio.run(scenario())
+    finally:
+        cleanup_files(files)
+    
+    print("  Асинхронный ввод-вывод работает!")
+
+def test_lazy_csv():
+    """Тест 27: Ленивое чтение CSV через mmap"""
+    print("Тест 27: Ленивое чтение CSV через mmap")
+    
+    import io
+    import contextlib
+    from table_processor import open_csv
+    files = ["lazy_test.csv", "lazy_test.csv.idx", "lazy_test.pkl"]
+    try:
+        with open(files[0], "w", encoding="utf-8", newline="") as f:
+            f.write("ID,Text,Price\r\n")
+            for i in range(5000):
+                text = f'"line {i}\nwith, comma"' if i % 100 == 0 else f"t{i}"
+                f.write(f"{i},{text},{i}.5\r\n")
+        
+        # 27.1 Открытие: только индекс смещений, строки разбираются по запросу
+        table = open_csv(files[0], cache_rows=10, persist_index=True)
+        assert table._columns == ["ID", "Text", "Price"] and len(table._data) == 5000
+        assert table._data.is_lazy and len(table._data._cache) == 0
+        assert table.get_rows_by_number(100).get_value("Text") == "line 100\nwith, comma"
+        assert table.get_rows_by_number(4999).get_value("Price") == "4999.5"
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            table.print_table(max_rows=3)
+        assert "t1 " in out.getvalue()
+        for i in range(50):
+            table.get_rows_by_number(i).get_value(0)
+        assert len(table._data._cache) == 10
+        
+        # 27.2 Данные совпадают с обычной загрузкой
+        assert table.get_values("Text") == load_table(files[0]).get_values("Text")
+        
+        # 27.3 Индекс сохраняется рядом с файлом и используется повторно
+        assert os.path.exists(files[1])
+        reopened = load_table(files[0], lazy=True, persist_index=True, detect_types=True)
+        assert reopened.get_column_types() == {0: "int", 1: "str", 2: "float"}
+        assert reopened._data.is_lazy
+        assert reopened.get_rows_by_number(2500, 2502).get_values("Price") == [2500.5, 2501.5]
+        
+        # Сохранение в pickle записывает разобранные строки, таблица остается ленивой
+        save_table(reopened, files[2])
+        assert reopened._data.is_lazy
+        pickled = load_table(files[2])
+        assert pickled.get_values("Price") == reopened.get_values("Price")
+        assert pickled.get_column_types() == {0: "int", 1: "str", 2: "float"}
+        
+        # 27.4 Запись разбирает файл целиком
+        reopened.set_values(list(range(5000)), "Price")
+        assert not reopened._data.is_lazy
+        assert reopened.get_values("Price")[:2] == [0.0, 1.0]
+        assert reopened.get_rows_by_index(4001).get_value("Text") == "t4001"
+    finally:
+        cleanup_files(files)
+    
+    print("  Ленивое чтение CSV работает!")
+
+def test_sorted_index():
+    """Тест 28: Сортированный индекс колонки"""
+    print("Тест 28: Сортированный индекс колонки")
+    
+    from table_processor.base_table import TableError
+    rows = [[i, f"name{i % 7}", None if i % 10 == 0 else (i * 37) % 100] for i in range(200)]
+    table = Table(rows, ["ID", "Name", "Score"])
+    table.set_column_types({0: "int", 1: "str", 2: "int"})
+    
+    # 28.1 Индекс требует приведенную колонку
+    try:
+        Table([[1, "a"]], ["ID", "Name"]).create_index("Name")
+        assert False
+    except TableError:
+        pass
+    try:
+        table.create_index("Score", kind="hash")
+        assert False
+    except TableError:
+        pass
+    
+    # 28.2 Диапазон и префикс совпадают с просмотром колонки
+    expected = table.get_rows_by_range("Score", 20, 40, include_high=False).get_values("ID")
+    table.create_index("Score")
+    table.create_index("Name")
+    assert table.get_rows_by_range("Score", 20, 40, include_high=False).get_values("ID") == expected
+    assert all(20 <= (i * 37) % 100 < 40 and i % 10 for i in expected)
+    assert table.get_rows_by_range("Score", high="5").get_values("Score") == [
+        v for v in table.get_values("Score") if v is not None and v <= 5]
+    assert table.get_rows_by_prefix("Name", "name3").get_values("ID") == list(range(3, 200, 7))
+    assert table._indexes["Score"].ordered_positions()[-20:] == list(range(0, 200, 10))
+    
+    # 28.3 Индекс обновляется при set_values, добавлении и вставке строк
+    view = table.get_rows_by_number(0, 10)
+    view.set_values([1000] * 10, "Score")
+    assert table.get_rows_by_range("Score", 1000).get_values("ID") == list(range(10))
+    table.append_row([200, "extra", 1001])
+    assert table.get_rows_by_range("Score", 1001).get_values("ID") == [200]
+    table.insert_rows(0, [[-1, "first", 1002]])
+    assert table.get_rows_by_range("Score", 1000).get_values("ID") == list(range(-1, 10)) + [200]
+    
+    # 28.4 Запросы используют индекс; результат на представлении - в его строках
+    assert table.where("Score", ">=", 1001).execute().get_values("ID") == [-1, 200]
+    sub = table.get_rows_by_number(100, 150)
+    assert sub.get_rows_by_prefix("Name", "name0").get_values("ID") == list(range(105, 149, 7))
+    
+    # 28.5 Индексы сохраняются в pickle
+    try:
+        save_table(table, "sorted_index.pkl")
+        loaded = load_table("sorted_index.pkl")
+        assert set(loaded._indexes) == {"Score", "Name"}
+        assert loaded.get_rows_by_range("Score", 1001).get_values("ID") == [-1, 200]
+    finally:
+        cleanup_files(["sorted_index.pkl"])
+    
+    # 28.6 Большие записи перестраивают индекс целиком
+    big = Table([[i, str(i % 3)] for i in range(1000)], ["ID", "V"])
+    big.set_column_types({0: "int", 1: "int"})
+    big.create_index("V")
+    big.set_values([(i + 1) % 3 for i in range(1000)], "V")
+    assert big.get_rows_by_range("V", 1, 1).get_values("ID")[:3] == [0, 3, 6]
+    big.extend_rows([[i, 5] for i in range(1000, 1100)])
+    assert big.get_rows_by_range("V", 5).get_values("ID") == list(range(1000, 1100))
+    
+    # 28.7 Префикс, оканчивающийся на U+10FFFF
+    top = chr(0x10FFFF)
+    words = Table([["a" + top], ["a" + top + "x"], ["b"], ["a"]], ["W"])
+    words.set_column_types({0: "str"})
+    words.create_index("W")
+    assert words.get_rows_by_prefix("W", "a" + top).get_values("W") == ["a" + top, "a" + top + "x"]
+    
+    # 28.8 Неприводимая граница - ошибка с индексом и без него
+    for col in ("Score", "ID"):
+        try:
+            table.get_rows_by_range(col, low="abc")
+            assert False, "Должна быть ошибка границы"
+        except TableError:
+            pass
+    
+    print("  Сортированный индекс работает!")
+
+def test_parallel_casting():
+    """Тест 29: Параллельное приведение типов"""
+    print("Тест 29: Параллельное приведение типов")
+    
+    import table_processor.base_table as base_table
+    rows = [[str(i), f"{i}.5" if i % 9 else "", "yes" if i % 2 else "no",
+             f"2024-01-{i % 28 + 1:02d}", f"c{i % 3}"] for i in range(3000)]
+    columns = ["ID", "Price", "Flag", "Date", "Kind"]
+    
+    def build(storage="rows"):
+        return Table([list(row) for row in rows], columns, storage=storage)
+    
+    # 29.1 Результат совпадает с последовательным приведением, в т.ч. при делении на блоки строк
+    block_rows = base_table.PARALLEL_BLOCK_ROWS
+    base_table.PARALLEL_BLOCK_ROWS = 700
+    try:
+        serial = build()
+        serial.auto_detect_column_types(categories=True)
+        for storage in ("rows", "columns"):
+            table = build(storage)
+            table.auto_detect_column_types(categories=True, workers=2)
+            assert table.get_column_types() == serial.get_column_types()
+            assert table.get_column_types()[4] == "category"
+            for col in columns:
+                assert table.get_values(col) == serial.get_values(col)
+    finally:
+        base_table.PARALLEL_BLOCK_ROWS = block_rows
+    
+    # 29.2 set_column_types: повторный тип колонки применяется по порядку
+    types = {"ID": "int", "Price": "float", "Date": "datetime"}
+    table = build()
+    table.set_column_types(types, by_number=False, workers=3)
+    expected = build()
+    expected.set_column_types(types, by_number=False)
+    for col in columns:
+        assert table.get_values(col) == expected.get_values(col)
+    table.set_column_types({0: "float", 1: "str"}, workers=2)
+    assert table.get_values("ID")[:2] == [0.0, 1.0] and table.get_values("Price")[:2] == [None, "1.5"]
+    
+    # 29.3 Представление отделяется от исходной таблицы, как и без workers
+    view = build().get_rows_by_number(10, 20)
+    view.set_column_types({0: "int"}, workers=2)
+    assert view.get_values("ID") == list(range(10, 20))
+    
+    print("  Параллельное приведение типов работает!")
+
+def test_type_inference():
+    """Тест 30: Определение типов по всей колонке"""
+    print("Тест 30: Определение типов по всей колонке")
+    
+    from table_processor import open_csv
+    from table_processor.base_table import TableError
+    rows = [[str(i), str(i), "0" if i % 2 else "1", f"2024-01-{i % 28 + 1:02d}", "" if i % 4 else str(i)]
+            for i in range(500)]
+    rows[300][1] = "3.5"
+    rows[400][3] = "n/a"
+    columns = ["ID", "Amount", "Flag", "Date", "Sparse"]
+    
+    # 30.1 Образец из первых строк не видит редких значений - ячейки теряются
+    table = Table([list(row) for row in rows], columns)
+    assert table.auto_detect_column_types() is None
+    assert table.get_column_types()[1] == "int" and table.get_values("Amount")[300] == 3
+    
+    # 30.2 Полный просмотр расширяет тип и сообщает о качестве колонки
+    table = Table([list(row) for row in rows], columns)
+    report = table.auto_detect_column_types(inference="full")
+    assert table.get_column_types() == {0: "int", 1: "float", 2: "bool", 3: "str", 4: "int"}
+    assert table.get_values("Amount")[300] == 3.5 and table.get_values("Date")[400] == "n/a"
+    assert report[0] == {"type": "int", "confidence": 1.0, "none_cells": 0,
+                         "scanned": 500, "stopped_early": False}
+    # Одно дробное среди целых: тип float, но совпадает с ним без расширения одна ячейка
+    assert report[1]["confidence"] == 1 / 500 and report[4]["none_cells"] == 375
+    # Строковая колонка: просмотр остановлен на первой нестроковой дате
+    assert report[3]["stopped_early"] and report[3]["scanned"] == 401
+    assert report[3]["confidence"] == 1 / 401
+    
+    # 30.3 Случайная выборка строк воспроизводима
+    first = Table([list(row) for row in rows], columns).auto_detect_column_types(
+        samples=100, inference="reservoir")
+    second = Table([list(row) for row in rows], columns).auto_detect_column_types(
+        samples=100, inference="reservoir")
+    assert first == second and first[0]["scanned"] == 100
+    # Число None во всей колонке оценивается по выборке
+    assert first[0]["estimated_none_cells"] == 0
+    assert first[4]["estimated_none_cells"] == round(first[4]["none_cells"] / 100 * 500)
+    assert 300 <= first[4]["estimated_none_cells"] <= 450
+    try:
+        table.auto_detect_column_types(inference="magic")
+        assert False
+    except TableError:
+        pass
+    
+    # 30.4 Ленивая таблица просматривается одним проходом, строки не разбираются в память
+    try:
+        save_table(Table([list(row) for row in rows], columns), "inference_test.csv")
+        lazy = open_csv("inference_test.csv")
+        lazy_report = lazy.auto_detect_column_types(inference="full")
+        assert lazy_report == report and lazy._data.is_lazy
+        assert lazy.get_rows_by_number(300).get_value("Amount") == 3.5
+    finally:
+        cleanup_files(["inference_test.csv"])
+    
+    # 30.5 Колонка из объектов datetime (после приведения или загрузки pickle)
+    for mode in ("full", "reservoir"):
+        dates = Table([[datetime(2020, 1, 1)], [datetime(2021, 6, 30)], [None]], ["D"])
+        dates_report = dates.auto_detect_column_types(inference=mode)
+        assert dates.get_column_types() == {0: "datetime"} and dates_report[0]["type"] == "datetime"
+        assert dates.get_values("D")[1] == datetime(2021, 6, 30)
+    
+    print("  Определение типов по всей колонке работает!")
+
 def run_all_tests():
     """Запуск всех тестов"""
     print("=" * 50)
@@ -225,7 +1361,31 @@ def run_all_tests():
         test_file_operations,
         test_multiple_files,
         test_exceptions,
-        test_datetime
+        test_datetime,
+        test_key_index,
+        test_columnar_storage,
+        test_csv_streaming,
+        test_type_detection_engine,
+        test_typed_storage,
+        test_row_views,
+        test_columnar_format,
+        test_parallel_loading,
+        test_segmented_pickle,
+        test_text_rendering,
+        test_column_lookup,
+        test_query_engine,
+        test_group_by,
+        test_join,
+        test_row_append,
+        test_csv_writer,
+        test_cast_cache,
+        test_category_columns,
+        test_profiling,
+        test_async_io,
+        test_lazy_csv,
+        test_sorted_index,
+        test_parallel_casting,
+        test_type_inference
     ]
     
     passed = 0